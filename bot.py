@@ -6,26 +6,41 @@ import os
 import json
 import time
 from dotenv import load_dotenv
-from mcstatus import JavaServer
-from mcrcon import MCRcon
 import psutil
 import threading
+import functools
+import weakref
+import select
+import ctypes
+import ctypes.util
+import struct
+import bisect
+import zlib
+import itertools
 import random
 from pathlib import Path
 from itertools import cycle
+from collections import deque
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 import re 
 from datetime import datetime, timezone, timedelta, date
 from discord import app_commands
 from zoneinfo import available_timezones, ZoneInfo
-from typing import Optional
+from typing import Optional, NamedTuple
+from types import MappingProxyType
 import aiohttp
 import gzip
+import sqlite3
 import logging
 from logging.handlers import TimedRotatingFileHandler
 import random
 import base64
 import traceback
 import io
+from log_events import (
+    LogEvent, LogClassifier, LOG_EVENT_RULES, parse_log_timestamp,
+)
 
 # Load environment
 load_dotenv()
@@ -71,14 +86,51 @@ CONFIG = {
     "config_file": "bot_config.json",
     "log_poll_interval": 1,
     "server_check_interval": 5,
-    "guild_id": None
+    "guild_id": None,
+    "rcon_max_sessions": 2,
+    "rcon_timeout": 10,
+    "rcon_keepalive_interval": 60,
+    "query_timeout": 5,
+    "player_snapshot_ttl": 10,
+    "chat_relay_window": 0.25,
+    "chat_relay_max_queue": 200,
+    "chat_relay_overflow": "merge",
+    "discord_relay_max_delay": 1.0,
+    "discord_relay_max_queue": 500,
+    "log_checkpoint_interval": 0.5,
+    "log_checkpoint_max_age": 600,
+    "boot_scan_max_bytes": 8388608,
+    "claims_commit_window": 0.02,
+    "claims_checkpoint_interval": 300,
+    "reward_watch_interval": 5,
+    "storage_io_workers": 2,
+    "claim_delivery_workers": 2,
+    "claim_batch_window": 0.1,
+    "claim_batch_max": 8,
+    "claim_queue_max": 200,
+    "server_process_match": None,
+    "health_probe_timeout": 5,
+    "health_failure_threshold": 3,
+    "health_slow_probe": 1.0,
+    "health_degraded_interval": 1,
+    "perf_sample_interval": 10,
+    "perf_history": 720,
+    "perf_command": None,
+    "hoststats_cpu_alert": 90,
+    "hoststats_rss_alert_mb": None,
+    "hoststats_alert_window": 120
 }
 
 DATA_DIR = "data"
 LINKED_FILE = os.path.join("data", "linked_users.json")
 REWARD_FILE = os.path.join("data", "daily_rewards.json")
 CLAIMS_FILE = os.path.join("data", "daily_claims.json")
-START_TIME_CACHE_FILE = os.path.join("data", "last_server_start.json")
+DB_FILE = os.path.join("data", "wanderbot.db")
+BOOT_INDEX_FILE = os.path.join("data", "boot_index.json")
+SESSIONS_FILE = os.path.join("data", "sessions.log")
+LOG_CHECKPOINT_FILE = os.path.join("data", "log_checkpoint.json")
+SERVER_LOG_DIR = Path("H:/Wanderlust Unbound Lite Server/logs")
+SERVER_DIR = SERVER_LOG_DIR.parent
 
 status_msgs = cycle([
     "Keeping eyes on creepers 👀",
@@ -168,6 +220,1539 @@ intents = discord.Intents.default()
 intents.message_content = True
 bot = commands.Bot(command_prefix="!", intents=intents)
 
+# ---------------------- RCON Pool ----------------------
+
+RCON_TYPE_RESPONSE = 0
+RCON_TYPE_COMMAND = 2
+RCON_TYPE_AUTH = 3
+RCON_FRAGMENT_SIZE = 4096  # Minecraft splits longer replies into several packets
+RCON_MAX_COMMAND_BYTES = 1446  # Largest command payload vanilla accepts
+
+class RconError(Exception):
+    pass
+
+class RconConnectionError(RconError):
+    """The command never reached the server, so it is safe to retry."""
+
+# Replies that mean the command ran but failed (vanilla console output is always English)
+RCON_ERROR_MARKERS = (
+    "Unknown or incomplete command",
+    "Incorrect argument for command",
+    "No entity was found",
+    "No player was found",
+    "Unknown item",
+    "Expected whitespace to end one argument",
+)
+
+def encode_rcon_packet(request_id: int, packet_type: int, payload: str) -> bytes:
+    body = struct.pack("<ii", request_id, packet_type) + payload.encode("utf-8") + b"\x00\x00"
+    return struct.pack("<i", len(body)) + body
+
+class RconResult:
+    """
+    Outcome of one command in a batch: `response` on success, `error` otherwise.
+    `sent_but_unanswered` marks a command that went out but got no reply
+    (timeout, connection lost) — the server may or may not have run it.
+    """
+
+    def __init__(self, command: str, response: str = "", error: Optional[str] = None,
+                 sent_but_unanswered: bool = False):
+        self.command = command
+        self.response = response
+        self.error = error
+        self.sent_but_unanswered = sent_but_unanswered
+
+    @classmethod
+    def from_response(cls, command: str, response: str):
+        if any(marker in response for marker in RCON_ERROR_MARKERS):
+            return cls(command, response, error=response)
+        return cls(command, response)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+class RconConnection:
+    """
+    One authenticated asyncio RCON socket. The vanilla/Forge RCON thread
+    reads one packet per socket read and drops the client if two arrive
+    together, so callers take turns: only one request is ever outstanding.
+    A reader task routes replies (including multi-packet ones) back by
+    request ID.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, timeout: float):
+        self.reader = reader
+        self.writer = writer
+        self.timeout = timeout
+        self.closed = False
+        self.in_flight = 0
+        self.last_used = time.monotonic()
+        self._ids = itertools.count(1)
+        self._pending = {}  # request_id -> (Future, [payload chunks])
+        self._lock = asyncio.Lock()  # Held for the whole write → reply of a request
+        self._reader_task = None
+
+    @classmethod
+    async def open(cls, host: str, port: int, password: str, timeout: float):
+        # Nothing has been sent yet, so every failure here is an RconConnectionError
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            raise RconConnectionError(f"RCON connect to {host}:{port} failed: {e or type(e).__name__}") from e
+        conn = cls(reader, writer, timeout)
+        try:
+            await asyncio.wait_for(conn._authenticate(password), timeout)
+        except (OSError, EOFError, asyncio.TimeoutError, RconError) as e:
+            writer.close()
+            raise RconConnectionError(f"RCON login failed: {e or type(e).__name__}") from e
+        except BaseException:
+            writer.close()
+            raise
+        conn._reader_task = asyncio.create_task(conn._read_loop())
+        return conn
+
+    def _next_id(self) -> int:
+        return next(self._ids) % 0x7FFFFFFE + 1
+
+    async def _read_packet(self):
+        try:
+            (length,) = struct.unpack("<i", await self.reader.readexactly(4))
+            if length < 10:
+                raise RconError(f"Malformed RCON packet (length {length})")
+            body = await self.reader.readexactly(length)
+        except asyncio.IncompleteReadError as e:
+            raise RconConnectionError("RCON connection closed by server") from e
+        request_id, packet_type = struct.unpack("<ii", body[:8])
+        return request_id, packet_type, body[8:-2]
+
+    async def _authenticate(self, password: str):
+        auth_id = self._next_id()
+        self.writer.write(encode_rcon_packet(auth_id, RCON_TYPE_AUTH, password))
+        await self.writer.drain()
+        while True:
+            request_id, packet_type, _ = await self._read_packet()
+            if request_id == -1:
+                raise RconError("RCON authentication failed (wrong password?)")
+            # Some servers send an empty RESPONSE_VALUE before the auth reply
+            if request_id == auth_id and packet_type == RCON_TYPE_COMMAND:
+                return
+
+    def _finish(self, request_id: int):
+        entry = self._pending.pop(request_id, None)
+        if entry and not entry[0].done():
+            entry[0].set_result("".join(entry[1]))
+
+    async def _read_loop(self):
+        # The server answers in order, so a reply is complete once a short
+        # fragment arrives or the next request's reply starts.
+        current_id = None
+        try:
+            while True:
+                request_id, _, payload = await self._read_packet()
+                if current_id is not None and current_id != request_id:
+                    self._finish(current_id)
+                current_id = None
+
+                entry = self._pending.get(request_id)
+                if entry is None:
+                    continue  # Caller timed out or was cancelled
+
+                entry[1].append(payload.decode("utf-8", errors="replace"))
+                if len(payload) < RCON_FRAGMENT_SIZE:
+                    self._finish(request_id)
+                else:
+                    current_id = request_id
+        except asyncio.CancelledError:
+            self.close()
+        except Exception as e:
+            self.close(e)
+
+    async def _request(self, cmd: str, timeout: float) -> str:
+        """
+        Send one command and wait for its reply; the caller holds `_lock`.
+        Raises RconConnectionError if the command was never sent.
+        """
+        if self.closed:
+            raise RconConnectionError("RCON connection is closed")
+
+        request_id = self._next_id()
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = (future, [])
+        answered = False
+        try:
+            try:
+                self.writer.write(encode_rcon_packet(request_id, RCON_TYPE_COMMAND, cmd))
+                await self.writer.drain()
+            except (OSError, RuntimeError) as e:
+                self.close(e)
+                raise RconConnectionError(f"RCON send failed: {e}") from e
+
+            try:
+                reply = await asyncio.wait_for(future, timeout)
+                answered = True
+                return reply
+            except asyncio.TimeoutError:
+                entry = self._pending.get(request_id)
+                # A reply that filled an exact multiple of the fragment size has no short tail
+                if entry and entry[1]:
+                    return "".join(entry[1])
+                raise RconError(f"RCON command timed out after {timeout}s: {cmd}")
+        finally:
+            self._pending.pop(request_id, None)
+            if not answered:
+                # Timed out or cancelled: the server may still answer, so the socket can't be reused
+                self.close(RconError(f"no reply to {cmd!r}"))
+
+    async def command(self, cmd: str, timeout: Optional[float] = None) -> str:
+        self.in_flight += 1  # Counts callers waiting for their turn too, so the pool can spread load
+        try:
+            async with self._lock:
+                return await self._request(cmd, timeout or self.timeout)
+        finally:
+            self.in_flight -= 1
+            self.last_used = time.monotonic()
+
+    async def command_batch(self, cmds: list[str], timeout: Optional[float] = None) -> list[RconResult]:
+        """
+        Run `cmds` in order, each one answered before the next is sent, without
+        letting other callers in between. Raises RconConnectionError only if
+        nothing was sent; after that every command gets its own RconResult.
+        """
+        timeout = timeout or self.timeout
+        results = []
+        self.in_flight += 1
+        try:
+            async with self._lock:
+                for cmd in cmds:
+                    try:
+                        results.append(RconResult.from_response(cmd, await self._request(cmd, timeout)))
+                    except RconConnectionError as e:
+                        if not results:
+                            raise
+                        results.append(RconResult(cmd, error=f"not sent: {e}"))
+                    except RconError as e:
+                        # Timed out or the connection dropped after sending — it may still have run
+                        results.append(RconResult(cmd, error=str(e), sent_but_unanswered=True))
+            return results
+        finally:
+            self.in_flight -= 1
+            self.last_used = time.monotonic()
+
+    def close(self, error: Optional[Exception] = None):
+        if self.closed:
+            return
+        self.closed = True
+        pending = list(self._pending.values())
+        self._pending.clear()
+        self.writer.close()
+        if self._reader_task and self._reader_task is not asyncio.current_task():
+            self._reader_task.cancel()
+        for future, _ in pending:
+            if not future.done():
+                future.set_exception(RconError(f"RCON connection lost: {error or 'closed'}"))
+        if error:
+            logger.debug(f"🔌 RCON connection closed: {error}")
+
+class RconPool:
+    """
+    Long-lived pool of authenticated RCON connections.
+    Each socket runs one request at a time, so load is spread by opening up
+    to `rcon_max_sessions` of them; dead ones are replaced on demand and idle
+    ones are kept alive with a cheap command.
+    """
+
+    def __init__(self, target: Optional[tuple[str, int, str]] = None, timeout: Optional[float] = None):
+        self._lock = asyncio.Lock()
+        self._connections = []
+        self._opening: set[asyncio.Task] = set()  # Connects in progress, run outside the lock
+        self._target = None
+        self._fixed_target = target  # Set for a private pool (e.g. a benchmark's fake server); else from CONFIG
+        self._fixed_timeout = timeout
+        self._keepalive_task = None
+        self.stats = {
+            "connects": 0,
+            "connect_failures": 0,
+            "commands": 0,
+            "batches": 0,
+            "command_failures": 0,
+            "reused": 0,
+            "errors": 0,
+            "retries": 0,
+            "keepalives": 0,
+            "wait_total": 0.0,
+            "wait_max": 0.0,
+        }
+
+    def _settings(self):
+        if self._fixed_target:
+            return self._fixed_target
+        if not all([CONFIG.get("server_ip"), CONFIG.get("rcon_port"), CONFIG.get("rcon_password")]):
+            raise RconConnectionError("Missing RCON configuration")
+        return CONFIG["server_ip"], int(CONFIG["rcon_port"]), CONFIG["rcon_password"]
+
+    async def _acquire(self):
+        started = time.monotonic()
+        target = self._settings()
+        max_sessions = max(1, int(CONFIG.get("rcon_max_sessions", 2)))
+
+        async with self._lock:
+            # Config changed through /setserverconfig — drop old sockets
+            if target != self._target:
+                for conn in self._connections:
+                    conn.close()
+                self._connections = []
+                self._target = target
+
+            self._connections = [c for c in self._connections if not c.closed]
+            conn = min(self._connections, key=lambda c: c.in_flight, default=None)
+            free_slots = max_sessions - len(self._connections) - len(self._opening)
+            opener = None
+            if conn is None or (conn.in_flight and free_slots > 0):
+                if free_slots > 0 or not self._opening:
+                    opener = asyncio.create_task(self._open(target, max_sessions))
+                    opener.add_done_callback(lambda task: task.cancelled() or task.exception())
+                    self._opening.add(opener)
+                else:
+                    opener = next(iter(self._opening))  # Every slot is mid-connect; share one
+
+        # Connect outside the lock so a slow handshake doesn't hold up callers that can reuse a socket
+        reused = opener is None
+        if opener is not None:
+            conn = await asyncio.shield(opener)
+
+        waited = time.monotonic() - started
+        self.stats["wait_total"] += waited
+        self.stats["wait_max"] = max(self.stats["wait_max"], waited)
+        if reused:
+            self.stats["reused"] += 1
+
+        if self._keepalive_task is None or self._keepalive_task.done():
+            self._keepalive_task = asyncio.create_task(self._keepalive_loop())
+        return conn
+
+    async def _open(self, target: tuple[str, int, str], max_sessions: int) -> RconConnection:
+        try:
+            conn = await RconConnection.open(*target, timeout=self._fixed_timeout or float(CONFIG.get("rcon_timeout", 10)))
+        except Exception:
+            self.stats["connect_failures"] += 1
+            raise
+        finally:
+            self._opening.discard(asyncio.current_task())
+        if target != self._target:
+            conn.close()
+            raise RconConnectionError("RCON settings changed while connecting")
+        self._connections.append(conn)
+        self.stats["connects"] += 1
+        logger.debug(f"🔌 Opened RCON session ({len(self._connections)}/{max_sessions})")
+        return conn
+
+    async def command(self, cmd: str, timeout: Optional[float] = None) -> str:
+        self.stats["commands"] += 1
+
+        for attempt in range(2):
+            try:
+                conn = await self._acquire()
+                return await conn.command(cmd, timeout)
+            except RconConnectionError:
+                # Stale socket — the command was never sent, so reconnect once
+                if attempt == 0 and self._target is not None:
+                    self.stats["retries"] += 1
+                    continue
+                self.stats["errors"] += 1
+                raise
+            except Exception:
+                self.stats["errors"] += 1
+                raise
+
+    async def command_batch(self, cmds: list[str], timeout: Optional[float] = None) -> list[RconResult]:
+        """
+        Send several commands in order on one connection, without other
+        callers' commands in between. Returns one RconResult per command; a
+        failing command does not stop the ones after it.
+        """
+        self.stats["commands"] += len(cmds)
+        self.stats["batches"] += 1
+
+        for attempt in range(2):
+            try:
+                conn = await self._acquire()
+                results = await conn.command_batch(cmds, timeout)
+            except RconConnectionError:
+                if attempt == 0 and self._target is not None:
+                    self.stats["retries"] += 1
+                    continue
+                self.stats["errors"] += 1
+                raise
+            except Exception:
+                self.stats["errors"] += 1
+                raise
+
+            for result in results:
+                if not result.ok:
+                    self.stats["command_failures"] += 1
+                    logger.warning(f"⚠️ RCON batch command failed: {result.command!r} → {result.error}")
+            return results
+
+    async def _keepalive_loop(self):
+        while True:
+            interval = max(5, int(CONFIG.get("rcon_keepalive_interval", 60)))
+            await asyncio.sleep(interval)
+            idle = [c for c in self._connections if not c.closed and c.in_flight == 0
+                    and time.monotonic() - c.last_used >= interval]
+            for conn in idle:
+                try:
+                    await conn.command("list")
+                    self.stats["keepalives"] += 1
+                except Exception as e:
+                    logger.debug(f"💤 RCON keep-alive failed, dropping session: {e}")
+                    conn.close(e)
+
+    def metrics(self) -> dict:
+        stats = dict(self.stats)
+        stats["open_sessions"] = sum(1 for c in self._connections if not c.closed)
+        stats["in_flight"] = sum(c.in_flight for c in self._connections if not c.closed)
+        acquired = stats["connects"] + stats["reused"]
+        stats["reuse_ratio"] = stats["reused"] / acquired if acquired else 0.0
+        stats["wait_avg"] = stats["wait_total"] / acquired if acquired else 0.0
+        return stats
+
+    def close(self):
+        if self._keepalive_task:
+            self._keepalive_task.cancel()
+        for opener in self._opening:
+            opener.cancel()
+        for conn in self._connections:
+            conn.close()
+        self._connections = []
+
+rcon_pool = RconPool()
+
+# ---------------------- Server List Ping ----------------------
+
+def pack_varint(value: int) -> bytes:
+    value &= 0xFFFFFFFF
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+async def read_varint(reader: asyncio.StreamReader) -> int:
+    result = 0
+    for shift in range(0, 35, 7):
+        byte = (await reader.readexactly(1))[0]
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result - (1 << 32) if result & (1 << 31) else result
+    raise ValueError("VarInt is too long")
+
+def slp_packet(packet_id: int, payload: bytes = b"") -> bytes:
+    data = pack_varint(packet_id) + payload
+    return pack_varint(len(data)) + data
+
+def flatten_chat_component(component) -> str:
+    if isinstance(component, str):
+        return component
+    if isinstance(component, list):
+        return "".join(flatten_chat_component(c) for c in component)
+    if isinstance(component, dict):
+        return component.get("text", "") + "".join(flatten_chat_component(c) for c in component.get("extra", []))
+    return str(component or "")
+
+class ServerStatus:
+    def __init__(self, raw: dict, latency: float):
+        players = raw.get("players") or {}
+        self.players_online = players.get("online", 0)
+        self.players_max = players.get("max", 0)
+        self.players_sample = [p.get("name") for p in players.get("sample") or [] if p.get("name")]
+        self.motd = flatten_chat_component(raw.get("description", ""))
+        self.favicon = raw.get("favicon")
+        self.version = (raw.get("version") or {}).get("name")
+        self.latency = latency
+
+async def ping_server(host: str, port: int, timeout: Optional[float] = None) -> ServerStatus:
+    """Server List Ping (status + ping) over asyncio, bounded by `timeout` seconds."""
+    timeout = timeout or float(CONFIG.get("query_timeout", 5))
+    return await asyncio.wait_for(_ping_server(host, int(port)), timeout)
+
+async def _ping_server(host: str, port: int) -> ServerStatus:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        host_bytes = host.encode("utf-8")
+        handshake = (
+            pack_varint(-1)  # Protocol version: -1 means "just pinging"
+            + pack_varint(len(host_bytes)) + host_bytes
+            + struct.pack(">H", port)
+            + pack_varint(1)  # Next state: status
+        )
+        started = time.perf_counter()
+        writer.write(slp_packet(0x00, handshake) + slp_packet(0x00))
+        await writer.drain()
+
+        await read_varint(reader)  # Packet length
+        if await read_varint(reader) != 0x00:
+            raise ValueError("Unexpected status response packet")
+        raw = json.loads((await reader.readexactly(await read_varint(reader))).decode("utf-8"))
+        latency = (time.perf_counter() - started) * 1000
+
+        # Prefer a real ping/pong round trip, but some modded servers hang up early
+        try:
+            started = time.perf_counter()
+            writer.write(slp_packet(0x01, struct.pack(">q", int(time.time() * 1000))))
+            await writer.drain()
+            await read_varint(reader)
+            await read_varint(reader)
+            await reader.readexactly(8)
+            latency = (time.perf_counter() - started) * 1000
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+        return ServerStatus(raw, latency)
+    finally:
+        writer.close()
+
+# ---------------------- Player Snapshots ----------------------
+
+class PlayerSnapshot:
+    def __init__(self, count: int, max_players: int, names: list[str]):
+        self.count = count
+        self.max_players = max_players
+        self.names = names
+        self.taken_at = time.monotonic()
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.taken_at
+
+    def is_online(self, username: str) -> bool:
+        return username.lower() in (n.lower() for n in self.names)
+
+class PlayerSnapshotService:
+    """
+    Owns the online-player list. A background task refreshes it every
+    `player_snapshot_ttl` seconds and concurrent callers that need a fresh
+    copy share a single in-flight `list` request.
+    """
+
+    def __init__(self):
+        self.snapshot: Optional[PlayerSnapshot] = None
+        self.last_error: Optional[Exception] = None
+        self._inflight: Optional[asyncio.Task] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.stats = {"hits": 0, "refreshes": 0, "coalesced": 0, "failures": 0}
+
+    @property
+    def ttl(self) -> float:
+        return float(CONFIG.get("player_snapshot_ttl", 10))
+
+    def peek(self) -> Optional[PlayerSnapshot]:
+        """Latest snapshot without touching RCON (may be stale or None)."""
+        return self.snapshot
+
+    async def get(self, max_age: Optional[float] = None, force: bool = False) -> PlayerSnapshot:
+        max_age = self.ttl if max_age is None else max_age
+        if not force and self.snapshot and self.snapshot.age <= max_age:
+            self.stats["hits"] += 1
+            return self.snapshot
+        return await self.refresh()
+
+    async def refresh(self) -> PlayerSnapshot:
+        if self._inflight and not self._inflight.done():
+            self.stats["coalesced"] += 1
+        else:
+            self._inflight = asyncio.create_task(self._fetch())
+        # Shield so one cancelled caller doesn't cancel the request for everyone else
+        return await asyncio.shield(self._inflight)
+
+    async def _fetch(self) -> PlayerSnapshot:
+        self.stats["refreshes"] += 1
+        try:
+            response = await rcon_pool.command("list")
+        except Exception as e:
+            self.stats["failures"] += 1
+            self.last_error = e
+            raise
+
+        parsed = parse_rcon_list_output(response)
+        if parsed["count"] < 0:
+            self.stats["failures"] += 1
+            self.last_error = RconError(f"Unexpected list response: {response!r}")
+            raise self.last_error
+
+        self.snapshot = PlayerSnapshot(parsed["count"], parsed["max"], parsed["names"])
+        self.last_error = None
+        return self.snapshot
+
+    def start(self):
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def _refresh_loop(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.debug(f"👥 Player snapshot refresh failed: {e}")
+            await asyncio.sleep(self.ttl)
+
+    def metrics(self) -> dict:
+        stats = dict(self.stats)
+        stats["age"] = self.snapshot.age if self.snapshot else None
+        return stats
+
+player_snapshots = PlayerSnapshotService()
+
+# ---------------------- Chat Relay (Discord → MC) ----------------------
+
+class ChatRelayQueue:
+    """
+    Collects Discord messages for `chat_relay_window` seconds and relays the
+    whole burst as multi-line tellraw commands, sent one after another.
+    Messages keep their arrival order; when the queue is full new text is
+    merged into the author's pending message or the oldest message is dropped.
+    """
+
+    def __init__(self):
+        self._pending = deque()  # [author, text, enqueued_at]
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.latencies = deque(maxlen=500)
+        self.stats = {
+            "submitted": 0,
+            "relayed": 0,
+            "batches": 0,
+            "merged": 0,
+            "dropped": 0,
+            "failed": 0,
+            "peak_depth": 0,
+        }
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending)
+
+    def submit(self, author: str, text: str):
+        max_depth = max(1, int(CONFIG.get("chat_relay_max_queue", 200)))
+        self.stats["submitted"] += 1
+
+        if len(self._pending) >= max_depth:
+            if CONFIG.get("chat_relay_overflow", "merge") == "merge":
+                for entry in reversed(self._pending):
+                    if entry[0] == author:
+                        entry[1] += f" | {text}"
+                        self.stats["merged"] += 1
+                        return
+            dropped = self._pending.popleft()
+            self.stats["dropped"] += 1
+            logger.warning(f"⚠️ Chat relay queue full — dropped message from {dropped[0]}")
+
+        self._pending.append([author, text, time.monotonic()])
+        self.stats["peak_depth"] = max(self.stats["peak_depth"], len(self._pending))
+        self._wakeup.set()
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if not self._pending:
+                continue
+
+            # Let the rest of the burst arrive before sending
+            await asyncio.sleep(float(CONFIG.get("chat_relay_window", 0.25)))
+            batch = list(self._pending)
+            self._pending.clear()
+
+            try:
+                await self._deliver(batch)
+            except Exception as e:
+                self.stats["failed"] += len(batch)
+                logger.error(f"❌ Failed to relay {len(batch)} message(s) to Minecraft: {e}")
+
+    async def _deliver(self, batch):
+        tellraws = build_relay_tellraws([(author, text) for author, text, _ in batch])
+        self.stats["batches"] += 1
+
+        relayed = 0
+        for command, count in tellraws:
+            messages, batch = batch[:count], batch[count:]
+            try:
+                result = RconResult.from_response(command, await rcon_pool.command(command))
+            except Exception as e:
+                result = RconResult(command, error=str(e))
+            if not result.ok:
+                self.stats["failed"] += count
+                logger.error(f"❌ Failed to relay {count} message(s) to Minecraft: {result.error}")
+                continue
+
+            done = time.monotonic()
+            for _, _, enqueued_at in messages:
+                self.latencies.append(done - enqueued_at)
+            relayed += count
+
+        self.stats["relayed"] += relayed
+        if relayed:
+            logger.info(f"💬 Relayed {relayed} message(s) to Minecraft in {len(tellraws)} tellraw(s)")
+
+    def metrics(self) -> dict:
+        stats = dict(self.stats)
+        stats["depth"] = self.depth
+        stats["latency_p50"] = percentile(self.latencies, 50)
+        stats["latency_p95"] = percentile(self.latencies, 95)
+        stats["latency_max"] = max(self.latencies, default=0.0)
+        return stats
+
+def build_relay_tellraws(messages: list[tuple[str, str]]) -> list[tuple[str, int]]:
+    """
+    Pack (author, text) pairs into as few `tellraw` commands as fit in one
+    RCON packet, returned as (command, number of messages in it). Every line
+    looks exactly like a single relayed message.
+    """
+    limit = RCON_MAX_COMMAND_BYTES - 64
+    commands = []
+    components = []
+
+    def render(parts):
+        return f"tellraw @a {json.dumps(parts)}"
+
+    for author, text in messages:
+        prefix = {"text": ("\n" if components else "") + "[Discord] ", "color": "blue", "bold": True}
+        body = {"text": f"{author}: {text}", "color": "gray"}
+
+        if components and len(render(components + [prefix, body]).encode("utf-8")) > limit:
+            commands.append((render(components), len(components) // 2))
+            components = []
+            prefix["text"] = "[Discord] "
+
+        # A single huge message gets trimmed until it fits on its own
+        while len(render(components + [prefix, body]).encode("utf-8")) > limit and len(body["text"]) > 16:
+            body["text"] = body["text"][:int(len(body["text"]) * 0.8)] + "…"
+
+        components += [prefix, body]
+
+    if components:
+        commands.append((render(components), len(components) // 2))
+    return commands
+
+chat_relay = ChatRelayQueue()
+
+# ---------------------- Chat Relay (MC → Discord) ----------------------
+
+DISCORD_MESSAGE_LIMIT = 2000
+
+class DiscordOutbox:
+    """
+    Ordered Minecraft → Discord pipeline. Events are packed into messages of
+    up to 2000 characters and sent by a single worker, so they arrive in log
+    order. A message goes out once it is full or the oldest event has waited
+    `discord_relay_max_delay` seconds, paced by the channel's rate-limit bucket.
+    """
+
+    RATE_WINDOW = 60.0  # seconds covered by the events/messages per second figures
+    BUCKET_PERIOD = 5.0
+
+    def __init__(self):
+        self._pending = deque()  # (text, enqueued_at)
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        # Local mirror of Discord's per-channel bucket (5 messages / 5s until headers say otherwise)
+        self.bucket_limit = 5
+        self.bucket_remaining = 5
+        self.bucket_reset_at = 0.0
+        self.latencies = deque(maxlen=500)
+        self._sent_log = deque()  # (sent_at, events) for the last RATE_WINDOW seconds
+        self.stats = {
+            "submitted": 0,
+            "events_sent": 0,
+            "messages_sent": 0,
+            "rate_limited": 0,
+            "dropped": 0,
+            "failed": 0,
+            "peak_depth": 0,
+        }
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending)
+
+    def submit(self, text: str):
+        """Queue one event line. Must be called on the event loop (see relay_to_discord)."""
+        max_depth = max(1, int(CONFIG.get("discord_relay_max_queue", 500)))
+        self.stats["submitted"] += 1
+
+        if len(text) > DISCORD_MESSAGE_LIMIT:
+            text = text[:DISCORD_MESSAGE_LIMIT - 1] + "…"
+
+        if len(self._pending) >= max_depth:
+            self._pending.popleft()
+            self.stats["dropped"] += 1
+            logger.warning("⚠️ Discord relay queue full — dropped oldest event")
+
+        self._pending.append((text, time.monotonic()))
+        self.stats["peak_depth"] = max(self.stats["peak_depth"], len(self._pending))
+        self._wakeup.set()
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def _pending_chars(self) -> int:
+        # Joined with newlines, so every line after the first costs one extra character
+        return sum(len(text) for text, _ in self._pending) + max(0, len(self._pending) - 1)
+
+    def _take_message(self) -> list[tuple[str, float]]:
+        batch = []
+        size = 0
+        while self._pending:
+            text, enqueued_at = self._pending[0]
+            extra = len(text) + (1 if batch else 0)
+            if batch and size + extra > DISCORD_MESSAGE_LIMIT:
+                break
+            batch.append(self._pending.popleft())
+            size += extra
+        return batch
+
+    async def _wait_for_slot(self):
+        now = time.monotonic()
+        if now >= self.bucket_reset_at:
+            self.bucket_remaining = self.bucket_limit
+            self.bucket_reset_at = now + self.BUCKET_PERIOD
+        if self.bucket_remaining <= 0:
+            await asyncio.sleep(self.bucket_reset_at - now)
+            self.bucket_remaining = self.bucket_limit
+            self.bucket_reset_at = time.monotonic() + self.BUCKET_PERIOD
+        self.bucket_remaining -= 1
+
+    def _apply_rate_limit_headers(self, headers) -> float:
+        """Sync the local bucket with Discord's X-RateLimit-* headers; returns seconds to back off."""
+        try:
+            if "X-RateLimit-Limit" in headers:
+                self.bucket_limit = max(1, int(headers["X-RateLimit-Limit"]))
+            if "X-RateLimit-Remaining" in headers:
+                self.bucket_remaining = int(headers["X-RateLimit-Remaining"])
+            reset_after = float(headers.get("Retry-After") or headers.get("X-RateLimit-Reset-After") or 1.0)
+        except (TypeError, ValueError):
+            reset_after = 1.0
+        self.bucket_reset_at = time.monotonic() + reset_after
+        return reset_after
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+
+            while self._pending:
+                # Hold back until the message is full or the oldest event hits its deadline
+                deadline = self._pending[0][1] + float(CONFIG.get("discord_relay_max_delay", 1.0))
+                while self._pending_chars() < DISCORD_MESSAGE_LIMIT and time.monotonic() < deadline:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), deadline - time.monotonic())
+                    except asyncio.TimeoutError:
+                        break
+
+                await self._wait_for_slot()
+                batch = self._take_message()
+                try:
+                    await self._deliver(batch)
+                except Exception as e:
+                    self.stats["failed"] += len(batch)
+                    logger.error(f"❌ Failed to relay {len(batch)} event(s) to Discord: {e}")
+
+    async def _deliver(self, batch):
+        if not BotState.status_channel_id:
+            logger.warning("⚠️ No status channel ID set — cannot send message.")
+            self.stats["dropped"] += len(batch)
+            return
+
+        channel = bot.get_channel(BotState.status_channel_id)
+        if not channel:
+            logger.warning(f"⚠️ Channel with ID {BotState.status_channel_id} not found.")
+            self.stats["dropped"] += len(batch)
+            return
+
+        content = "\n".join(text for text, _ in batch)
+        for attempt in range(3):
+            try:
+                await channel.send(content)
+                break
+            except discord.Forbidden:
+                logger.error(f"🚫 Missing permissions to send messages in channel {channel.id}.")
+                self.stats["failed"] += len(batch)
+                return
+            except discord.HTTPException as e:
+                if e.status != 429 or attempt == 2:
+                    raise
+                self.stats["rate_limited"] += 1
+                retry_after = self._apply_rate_limit_headers(e.response.headers)
+                logger.warning(f"⏳ Discord rate limit hit — retrying relay in {retry_after:.2f}s")
+                await asyncio.sleep(retry_after)
+
+        done = time.monotonic()
+        for _, enqueued_at in batch:
+            self.latencies.append(done - enqueued_at)
+        self._sent_log.append((done, len(batch)))
+        self._trim_sent_log(done)
+        self.stats["events_sent"] += len(batch)
+        self.stats["messages_sent"] += 1
+        logger.info(f"✅ Sent {len(batch)} event(s) to Discord in one message")
+
+    def _trim_sent_log(self, now: float):
+        while self._sent_log and now - self._sent_log[0][0] > self.RATE_WINDOW:
+            self._sent_log.popleft()
+
+    def metrics(self) -> dict:
+        self._trim_sent_log(time.monotonic())
+        stats = dict(self.stats)
+        stats["depth"] = self.depth
+        stats["events_per_sec"] = sum(n for _, n in self._sent_log) / self.RATE_WINDOW
+        stats["messages_per_sec"] = len(self._sent_log) / self.RATE_WINDOW
+        stats["latency_p50"] = percentile(self.latencies, 50)
+        stats["latency_p95"] = percentile(self.latencies, 95)
+        return stats
+
+discord_outbox = DiscordOutbox()
+
+def relay_to_discord(message: str):
+    """Queue a status-channel line from any thread (the log poller runs off the loop)."""
+    bot.loop.call_soon_threadsafe(discord_outbox.submit, message)
+
+# ---------------------- Storage ----------------------
+
+# File and database work runs here so a slow disk never blocks the event
+# loop (or the gateway heartbeat). Bounded so a burst of commands queues
+# instead of spawning a thread per request.
+storage_executor: Optional[ThreadPoolExecutor] = None
+
+async def run_storage_io(func, *args):
+    global storage_executor
+    if storage_executor is None:  # Created on first use, after load_config() has run
+        storage_executor = ThreadPoolExecutor(
+            max_workers=max(1, int(CONFIG.get("storage_io_workers", 2))),
+            thread_name_prefix="storage-io"
+        )
+    return await asyncio.get_running_loop().run_in_executor(storage_executor, functools.partial(func, *args))
+
+class CoalescingFileWriter:
+    """
+    Serialized, coalescing writer for one file. At most one flush runs at a
+    time; writes submitted while a flush is in progress are merged, and only
+    the newest payload is written by the next flush. Every caller resumes
+    once a flush containing its payload has finished.
+    """
+
+    def __init__(self, path: str, write_func):
+        self.path = path
+        self.write_func = write_func  # Blocking: write_func(path, payload)
+        self._payload = None
+        self._waiters: list[asyncio.Future] = []
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"requests": 0, "flushes": 0, "failures": 0}
+
+    async def write(self, payload):
+        self.stats["requests"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._payload = payload
+        self._waiters.append(future)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_loop())
+        await future
+
+    async def _flush_loop(self):
+        while self._waiters:
+            payload, waiters = self._payload, self._waiters
+            self._payload, self._waiters = None, []
+            try:
+                await run_storage_io(self.write_func, self.path, payload)
+            except Exception as e:
+                self.stats["failures"] += 1
+                for future in waiters:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.stats["flushes"] += 1
+            for future in waiters:
+                if not future.done():
+                    future.set_result(None)
+
+file_writers: dict[str, CoalescingFileWriter] = {}
+
+def get_file_writer(path: str, write_func) -> CoalescingFileWriter:
+    writer = file_writers.get(path)
+    if writer is None:
+        writer = file_writers[path] = CoalescingFileWriter(path, write_func)
+    return writer
+
+class Database:
+    """
+    SQLite store (WAL mode) for linked accounts and daily claims.
+    Opened lazily; the first open migrates the legacy JSON files once and
+    renames them to `*.migrated`.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS links (
+            discord_id INTEGER PRIMARY KEY,
+            mc_username TEXT NOT NULL,
+            mc_username_lower TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS links_mc_username ON links (mc_username_lower);
+        CREATE TABLE IF NOT EXISTS claims (
+            mc_username TEXT PRIMARY KEY,
+            last_claim TEXT NOT NULL,
+            streak INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS claim_events (
+            id INTEGER PRIMARY KEY,
+            mc_username TEXT NOT NULL,
+            claimed_at TEXT NOT NULL,
+            claim_week TEXT NOT NULL,
+            streak INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS weekly_claims (
+            claim_week TEXT NOT NULL,
+            mc_username TEXT NOT NULL,
+            claims INTEGER NOT NULL,
+            max_streak INTEGER NOT NULL,
+            PRIMARY KEY (claim_week, mc_username)
+        );
+        CREATE TABLE IF NOT EXISTS claim_grants (
+            grant_key TEXT PRIMARY KEY,
+            mc_username TEXT NOT NULL,
+            claim_day TEXT NOT NULL,
+            status TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS claim_grants_day ON claim_grants (claim_day);
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+
+    def __init__(self, path: str, migrate_json: bool = True):
+        self.path = path
+        self.migrate_json = migrate_json
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=FULL")  # Every commit is fsynced; ClaimStore batches claims to share them
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.executescript(self.SCHEMA)
+            self._conn = conn
+            self._migrate_json()
+            self._seed_claim_history()
+            self._enforce_unique_usernames()
+        return self._conn
+
+    def _enforce_unique_usernames(self):
+        try:
+            self._conn.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS links_mc_username_unique ON links (mc_username_lower)"
+            )
+        except sqlite3.IntegrityError:
+            # Links made before /linkmc checked ownership — leave them for an admin to sort out
+            duplicates = self._conn.execute(
+                "SELECT mc_username_lower, group_concat(discord_id) FROM links "
+                "GROUP BY mc_username_lower HAVING count(*) > 1"
+            ).fetchall()
+            for name, owners in duplicates:
+                logger.warning(f"⚠️ Minecraft username '{name}' is linked to several Discord users: {owners}")
+
+    def execute(self, sql: str, params=()) -> sqlite3.Cursor:
+        with self._lock:
+            return self.conn.execute(sql, params)
+
+    def executemany(self, sql: str, rows: list):
+        """Run `sql` for every row inside one transaction (a single commit)."""
+        self.transaction([(sql, rows)])
+
+    def transaction(self, statements: list[tuple[str, list]]):
+        """Run each (sql, rows) pair with executemany, all in one transaction."""
+        with self._lock:
+            conn = self.conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for sql, rows in statements:
+                    conn.executemany(sql, rows)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def fetchone(self, sql: str, params=()) -> Optional[sqlite3.Row]:
+        with self._lock:
+            return self.conn.execute(sql, params).fetchone()
+
+    def fetchall(self, sql: str, params=()) -> list[sqlite3.Row]:
+        with self._lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def _migrate_json(self):
+        conn = self._conn
+        if not self.migrate_json or conn.execute("SELECT 1 FROM meta WHERE key = 'json_migrated'").fetchone():
+            return
+
+        def read_json(path):
+            if not os.path.exists(path):
+                return {}
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logger.error(f"❌ Cannot migrate {path}: {e}")
+                return None
+
+        links = read_json(LINKED_FILE)
+        claims = read_json(CLAIMS_FILE)
+        if links is None or claims is None:
+            return  # Leave the JSON files alone and try again next start
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO links (discord_id, mc_username, mc_username_lower) VALUES (?, ?, ?)",
+                [(int(discord_id), name, name.lower()) for discord_id, name in links.items()]
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO claims (mc_username, last_claim, streak) VALUES (?, ?, ?)",
+                [(name, info["last_claim"], int(info.get("streak", 1)))
+                 for name, info in claims.items() if info.get("last_claim")]
+            )
+            conn.execute("INSERT INTO meta (key, value) VALUES ('json_migrated', ?)", (datetime.now().isoformat(),))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        for path in (LINKED_FILE, CLAIMS_FILE):
+            if os.path.exists(path):
+                os.replace(path, path + ".migrated")
+        logger.info(f"📦 Migrated {len(links)} link(s) and {len(claims)} claim(s) from JSON to {self.path}")
+
+    def _seed_claim_history(self):
+        """Claims made before history was kept become one event each, so this week's board isn't empty."""
+        conn = self._conn
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'claim_history_seeded'").fetchone():
+            return
+
+        rows = conn.execute("SELECT mc_username, last_claim, streak FROM claims").fetchall()
+        events = []
+        for row in rows:
+            try:
+                week = claim_week(datetime.fromisoformat(row["last_claim"]))
+            except ValueError:
+                continue
+            events.append((row["mc_username"], row["last_claim"], week, row["streak"]))
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT INTO claim_events (mc_username, claimed_at, claim_week, streak) VALUES (?, ?, ?, ?)", events
+            )
+            conn.executemany(WEEKLY_CLAIMS_UPSERT, [(week, name, streak) for name, _, week, streak in events])
+            conn.execute("INSERT INTO meta (key, value) VALUES ('claim_history_seeded', ?)", (datetime.now().isoformat(),))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        logger.info(f"📦 Seeded claim history with {len(events)} existing claim(s).")
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+WEEKLY_CLAIMS_UPSERT = (
+    "INSERT INTO weekly_claims (claim_week, mc_username, claims, max_streak) VALUES (?, ?, 1, ?) "
+    "ON CONFLICT (claim_week, mc_username) DO UPDATE SET claims = claims + 1, "
+    "max_streak = max(max_streak, excluded.max_streak)"
+)
+
+db = Database(DB_FILE)
+
+class LinkConflictError(Exception):
+    """The Minecraft username is already linked to another Discord account."""
+
+    def __init__(self, mc_username: str, owner_id: int):
+        super().__init__(f"'{mc_username}' is already linked to Discord user {owner_id}")
+        self.mc_username = mc_username
+        self.owner_id = owner_id
+
+class LinkRegistry:
+    """
+    Linked accounts (Discord ID → Minecraft username) held in memory with
+    write-through to the database. Every reader and writer goes through here.
+    A reverse index (lowercased username → Discord ID) is kept in step with
+    every link, so ownership checks are O(1).
+    Outside edits (sqlite3 CLI, a restored backup) are noticed by a cheap
+    stat of the DB/WAL files, confirmed with `PRAGMA data_version`.
+    """
+
+    def __init__(self, database: Database):
+        self.db = database
+        self.links: Optional[dict[int, str]] = None
+        self.owners: dict[str, int] = {}
+        self._signature = None
+        self._data_version = None
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "reloads": 0, "writes": 0}
+
+    def _file_signature(self):
+        signature = []
+        for path in (self.db.path, self.db.path + "-wal"):
+            try:
+                st = os.stat(path)
+                signature.append((st.st_ino, st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def _reload(self):
+        rows = self.db.fetchall("SELECT discord_id, mc_username FROM links")
+        self.links = {row["discord_id"]: row["mc_username"] for row in rows}
+        self.owners = {}
+        for discord_id, name in self.links.items():
+            self.owners.setdefault(name.lower(), discord_id)
+        self._data_version = self.db.fetchone("PRAGMA data_version")[0]
+        self._signature = self._file_signature()
+        self.stats["reloads"] += 1
+        logger.info(f"🔗 Loaded {len(self.links)} linked account(s).")
+
+    def _ensure_fresh(self):
+        if self.links is None:
+            self.stats["misses"] += 1
+            self._reload()
+            return
+
+        signature = self._file_signature()
+        if signature == self._signature:
+            self.stats["hits"] += 1
+            return
+
+        if signature[0] is None or self._signature[0] is None or signature[0][0] != self._signature[0][0]:
+            # Database file was replaced — the open connection still points at the old one
+            self.db.close()
+        elif self.db.fetchone("PRAGMA data_version")[0] == self._data_version:
+            # Only our own writes (or a checkpoint) touched the files
+            self._signature = signature
+            self.stats["hits"] += 1
+            return
+
+        self.stats["misses"] += 1
+        logger.info("🔄 Linked accounts changed on disk — reloading.")
+        self._reload()
+
+    def get(self, discord_id: int) -> Optional[str]:
+        with self._lock:
+            self._ensure_fresh()
+            return self.links.get(int(discord_id))
+
+    def find_discord_id(self, mc_username: str) -> Optional[int]:
+        with self._lock:
+            self._ensure_fresh()
+            return self.owners.get(mc_username.lower())
+
+    def all(self) -> dict[int, str]:
+        with self._lock:
+            self._ensure_fresh()
+            return dict(self.links)
+
+    def set(self, discord_id: int, mc_username: str):
+        """Link or relink; raises LinkConflictError if someone else owns the name."""
+        discord_id = int(discord_id)
+        name = mc_username.lower()
+        with self._lock:
+            self._ensure_fresh()
+            owner = self.owners.get(name)
+            if owner is not None and owner != discord_id:
+                raise LinkConflictError(mc_username, owner)
+
+            try:
+                self.db.execute(
+                    "INSERT INTO links (discord_id, mc_username, mc_username_lower) VALUES (?, ?, ?) "
+                    "ON CONFLICT (discord_id) DO UPDATE SET mc_username = excluded.mc_username, "
+                    "mc_username_lower = excluded.mc_username_lower",
+                    (discord_id, mc_username, name)
+                )
+            except sqlite3.IntegrityError:
+                # Unique index caught a link made outside this registry — resync and report it
+                self._reload()
+                raise LinkConflictError(mc_username, self.owners.get(name, 0))
+
+            previous = self.links.get(discord_id)
+            if previous is not None and self.owners.get(previous.lower()) == discord_id:
+                del self.owners[previous.lower()]
+            self.links[discord_id] = mc_username
+            self.owners[name] = discord_id
+            self._signature = self._file_signature()
+            self.stats["writes"] += 1
+
+    def metrics(self) -> dict:
+        stats = dict(self.stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        stats["size"] = len(self.links) if self.links is not None else 0
+        return stats
+
+link_registry = LinkRegistry(db)
+
+class WeeklyClaimBoard:
+    """One claim week's per-player counters, kept ranked as they change."""
+
+    def __init__(self, week: str, rows=()):
+        self.week = week
+        self.totals: dict[str, tuple[int, int]] = {}  # username -> (claims, max_streak)
+        self.ranking: list[tuple[int, int, str]] = []  # (-claims, -max_streak, username), sorted
+        for username, claims, max_streak in rows:
+            self.totals[username] = (claims, max_streak)
+            self.ranking.append((-claims, -max_streak, username))
+        self.ranking.sort()
+
+    def add(self, username: str, streak: int):
+        claims, max_streak = self.totals.get(username, (0, 0))
+        if claims:
+            del self.ranking[bisect.bisect_left(self.ranking, (-claims, -max_streak, username))]
+        claims, max_streak = claims + 1, max(max_streak, streak)
+        self.totals[username] = (claims, max_streak)
+        bisect.insort(self.ranking, (-claims, -max_streak, username))
+
+    def top(self, limit: int = 10) -> list[tuple[str, int, int]]:
+        return [(username, -claims, -max_streak) for claims, max_streak, username in self.ranking[:limit]]
+
+class ClaimStore:
+    """
+    Daily claims kept in memory (loaded once from the claims table) with
+    group-committed writes. Claims arriving within `claims_commit_window`
+    seconds are written in one transaction, so they share one WAL fsync;
+    each caller resumes only once its claim is durable. A background task
+    checkpoints the WAL back into the main database file.
+    Every claim is also appended to `claim_events` and folded into that
+    week's `weekly_claims` counters in the same transaction, so weekly
+    boards never need a scan of the history.
+    Grants are reserved in `claim_grants` under a per-player, per-reward-day
+    key before the reward is delivered, so a reward day can be granted at
+    most once even across restarts.
+    """
+
+    def __init__(self, database: Database):
+        self.db = database
+        self.claims: Optional[dict[str, tuple[str, int]]] = None  # username -> (last_claim, streak)
+        self.grants: dict[str, str] = {}  # grant key -> "reserved" | "delivered"
+        self._locks = weakref.WeakValueDictionary()  # lowercased username -> asyncio.Lock
+        self._load_lock = threading.Lock()  # Storage workers can race to the first load
+        self._queue: list[tuple[str, tuple, asyncio.Future]] = []  # (kind, row, future)
+        self.weeks: dict[str, WeeklyClaimBoard] = {}
+        self._generation = 0  # Odd while a commit is in flight
+        self._wakeup = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+        self._checkpointer: Optional[asyncio.Task] = None
+        self.commit_latencies = deque(maxlen=500)
+        self.stats = {"claims": 0, "batches": 0, "max_batch": 0, "failures": 0, "checkpoints": 0,
+                      "reserved": 0, "released": 0, "duplicates": 0}
+
+    def _load(self):
+        with self._load_lock:
+            if self.claims is not None:
+                return  # A second load would wipe out reservations made since the first
+            rows = self.db.fetchall("SELECT mc_username, last_claim, streak FROM claims")
+            since = (claim_day(datetime.now(timezone.utc)) - timedelta(days=1)).isoformat()
+            grants = self.db.fetchall("SELECT grant_key, status FROM claim_grants WHERE claim_day >= ?", (since,))
+            self.grants = {row["grant_key"]: row["status"] for row in grants}
+            self.claims = {row["mc_username"]: (row["last_claim"], row["streak"]) for row in rows}
+            logger.info(f"📒 Loaded {len(self.claims)} claim record(s).")
+
+    def get(self, username: str) -> Optional[tuple[str, int]]:
+        self._load()
+        return self.claims.get(username)
+
+    async def aget(self, username: str) -> Optional[tuple[str, int]]:
+        if self.claims is None:
+            await run_storage_io(self._load)
+        return self.claims.get(username)
+
+    def lock(self, username: str) -> asyncio.Lock:
+        """One lock per player, shared by every Discord account linked to the name."""
+        key = username.lower()
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        return lock
+
+    async def _submit(self, kind: str, row: tuple):
+        future = asyncio.get_running_loop().create_future()
+        self._queue.append((kind, row, future))
+        self._wakeup.set()
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._write_loop())
+        await future
+
+    async def reserve(self, username: str, moment: datetime) -> bool:
+        """Durably reserve this reward day's grant; False if it is already reserved or delivered."""
+        if self.claims is None:
+            await run_storage_io(self._load)
+        key = claim_key(username, moment)
+        if key in self.grants:
+            self.stats["duplicates"] += 1
+            return False
+
+        self.grants[key] = "reserved"  # Taken before the write, so a concurrent caller can't slip in
+        try:
+            await self._submit("reserve", (key, username, claim_day(moment).isoformat(), moment.isoformat()))
+        except Exception:
+            self.grants.pop(key, None)
+            raise
+        self.stats["reserved"] += 1
+        return True
+
+    async def release(self, username: str, moment: datetime):
+        """Drop a reservation whose reward was definitely not delivered."""
+        key = claim_key(username, moment)
+        await self._submit("release", (key,))
+        if self.grants.get(key) == "reserved":
+            del self.grants[key]
+        self.stats["released"] += 1
+
+    async def record(self, username: str, last_claim: str, streak: int):
+        """Store a claim (marking its grant delivered) and wait until it has been committed."""
+        if self.claims is None:
+            await run_storage_io(self._load)
+        moment = datetime.fromisoformat(last_claim)
+        key = claim_key(username, moment)
+        await self._submit("claim", (username, last_claim, claim_week(moment), streak, key, claim_day(moment).isoformat()))
+        self.claims[username] = (last_claim, streak)
+        self.grants[key] = "delivered"
+
+    def _commit(self, batch):
+        rows = {"reserve": [], "claim": [], "release": []}
+        for kind, row, _ in batch:
+            rows[kind].append(row)
+        claims = rows["claim"]
+        self.db.transaction([
+            ("INSERT OR IGNORE INTO claim_grants (grant_key, mc_username, claim_day, status, updated_at) "
+             "VALUES (?, ?, ?, 'reserved', ?)",
+             rows["reserve"]),
+            ("INSERT INTO claims (mc_username, last_claim, streak) VALUES (?, ?, ?) "
+             "ON CONFLICT (mc_username) DO UPDATE SET last_claim = excluded.last_claim, streak = excluded.streak",
+             [(username, last_claim, streak) for username, last_claim, _, streak, _, _ in claims]),
+            ("INSERT INTO claim_events (mc_username, claimed_at, claim_week, streak) VALUES (?, ?, ?, ?)",
+             [(username, last_claim, week, streak) for username, last_claim, week, streak, _, _ in claims]),
+            (WEEKLY_CLAIMS_UPSERT,
+             [(week, username, streak) for username, _, week, streak, _, _ in claims]),
+            ("INSERT INTO claim_grants (grant_key, mc_username, claim_day, status, updated_at) "
+             "VALUES (?, ?, ?, 'delivered', ?) "
+             "ON CONFLICT (grant_key) DO UPDATE SET status = 'delivered', updated_at = excluded.updated_at",
+             [(key, username, day, last_claim) for username, last_claim, _, _, key, day in claims]),
+            ("DELETE FROM claim_grants WHERE grant_key = ? AND status = 'reserved'",
+             rows["release"]),
+        ])
+
+    def _load_week(self, week: str) -> WeeklyClaimBoard:
+        rows = self.db.fetchall(
+            "SELECT mc_username, claims, max_streak FROM weekly_claims WHERE claim_week = ?", (week,)
+        )
+        return WeeklyClaimBoard(week, [(row["mc_username"], row["claims"], row["max_streak"]) for row in rows])
+
+    async def weekly_top(self, week: str, limit: int = 10) -> list[tuple[str, int, int]]:
+        """(username, claims, best streak) for the week, most claims first."""
+        for _ in range(3):
+            if week in self.weeks:
+                break
+            generation = self._generation
+            board = await run_storage_io(self._load_week, week)
+            # Only trust the load if no commit overlapped it; otherwise it may miss or double-count claims
+            if generation % 2 == 0 and generation == self._generation and week not in self.weeks:
+                self.weeks[week] = board
+                for stale in sorted(self.weeks)[:-4]:  # Only recent weeks stay cached
+                    del self.weeks[stale]
+        else:
+            if week not in self.weeks:
+                # Commits kept overlapping the load; show that load uncached rather than spin
+                logger.debug(f"📊 Weekly board {week} kept changing while loading; serving an uncached copy")
+                return board.top(limit)
+        return self.weeks[week].top(limit)
+
+    async def _write_loop(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if not self._queue:
+                continue
+
+            # Give concurrent claims a moment to join this commit
+            await asyncio.sleep(float(CONFIG.get("claims_commit_window", 0.02)))
+            batch, self._queue = self._queue, []
+
+            started = time.monotonic()
+            self._generation += 1
+            try:
+                await run_storage_io(self._commit, batch)
+            except Exception as e:
+                self._generation += 1
+                self.stats["failures"] += 1
+                logger.error(f"❌ Failed to commit {len(batch)} claim write(s): {e}")
+                for *_, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self._generation += 1
+            claims = 0
+            for kind, row, _ in batch:
+                if kind == "claim":
+                    claims += 1
+                    username, _, week, streak, _, _ = row
+                    if week in self.weeks:
+                        self.weeks[week].add(username, streak)
+
+            self.commit_latencies.append(time.monotonic() - started)
+            self.stats["claims"] += claims
+            self.stats["batches"] += 1
+            self.stats["max_batch"] = max(self.stats["max_batch"], len(batch))
+            for *_, future in batch:
+                if not future.done():
+                    future.set_result(None)
+
+    def start(self):
+        if self._checkpointer is None or self._checkpointer.done():
+            self._checkpointer = asyncio.create_task(self._checkpoint_loop())
+
+    async def _checkpoint_loop(self):
+        while True:
+            await asyncio.sleep(max(10, int(CONFIG.get("claims_checkpoint_interval", 300))))
+            # Grants older than yesterday can't be claimed again; forget them
+            since = (claim_day(datetime.now(timezone.utc)) - timedelta(days=1)).isoformat()
+            self.grants = {key: status for key, status in self.grants.items() if key.rsplit(":", 1)[1] >= since}
+            try:
+                await run_storage_io(self.db.execute, "PRAGMA wal_checkpoint(TRUNCATE)")
+                self.stats["checkpoints"] += 1
+                logger.debug("🗜️ Checkpointed the database WAL.")
+            except Exception as e:
+                logger.warning(f"⚠️ WAL checkpoint failed: {e}")
+
+    def metrics(self) -> dict:
+        stats = dict(self.stats)
+        stats["pending"] = len(self._queue)
+        stats["commit_p50"] = percentile(self.commit_latencies, 50)
+        stats["commit_p95"] = percentile(self.commit_latencies, 95)
+        return stats
+
+claim_store = ClaimStore(db)
+
 # ---------------------- Helpers ----------------------
 
 def handle_exception(exc_type, exc_value, exc_traceback):
@@ -195,47 +1780,15 @@ def handle_exception(exc_type, exc_value, exc_traceback):
     except Exception as e:
         logger.error(f"⚠️ Failed to write crash log: {e}")
 
-def clear_server_start_cache():
-    try:
-        if os.path.exists(START_TIME_CACHE_FILE):
-            os.remove(START_TIME_CACHE_FILE)
-            logger.info("🗑️ Cleared server start cache.")
-    except Exception as e:
-        logger.error(f"❌ Failed to clear cache: {e}")
-
-def save_server_start_time(timestamp):
-    try:
-        os.makedirs("data", exist_ok=True)
-        with open(START_TIME_CACHE_FILE, "w") as f:
-            json.dump({"timestamp": timestamp}, f)
-        logger.info(f"🕰️ Cached server start time: {timestamp}")
-    except Exception as e:
-        logger.error(f"❌ Failed to save server start time: {e}")
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
 
-def load_cached_server_start_time():
-    try:
-        if os.path.exists(START_TIME_CACHE_FILE):
-            with open(START_TIME_CACHE_FILE, "r") as f:
-                data = json.load(f)
-                ts = data.get("timestamp")
-
-                if ts:
-                    boot_time = datetime.fromtimestamp(ts)
-                    now = datetime.now()
-
-                    # Invalidate cache older than 15 minutes or from a different day
-                    if (now - boot_time).total_seconds() > 900 or now.date() != boot_time.date():
-                        logger.warning("⚠️ Cached server start time is stale or outdated. Ignoring.")
-                        return None
-
-                    logger.info(f"📦 Loaded fresh cached server start time: {ts}")
-                    return ts
-    except Exception as e:
-        logger.error(f"❌ Failed to read server start time cache: {e}")
-    return None
-
-def save_config():
-    config_to_save = {
+def config_snapshot() -> dict:
+    return {
         "server_ip": CONFIG.get("server_ip"),
         "server_port": CONFIG.get("server_port"),
         "rcon_port": CONFIG.get("rcon_port"),
@@ -245,10 +1798,42 @@ def save_config():
         "timezone": CONFIG.get("timezone", "UTC"),
         "thread_id": CONFIG.get("thread_id"),
         "message_id": CONFIG.get("message_id"),
-        "server_check_interval": CONFIG.get("server_check_interval", 5)
+        "server_check_interval": CONFIG.get("server_check_interval", 5),
+        "rcon_max_sessions": CONFIG.get("rcon_max_sessions", 2),
+        "rcon_timeout": CONFIG.get("rcon_timeout", 10),
+        "rcon_keepalive_interval": CONFIG.get("rcon_keepalive_interval", 60),
+        "query_timeout": CONFIG.get("query_timeout", 5),
+        "player_snapshot_ttl": CONFIG.get("player_snapshot_ttl", 10),
+        "chat_relay_window": CONFIG.get("chat_relay_window", 0.25),
+        "chat_relay_max_queue": CONFIG.get("chat_relay_max_queue", 200),
+        "chat_relay_overflow": CONFIG.get("chat_relay_overflow", "merge"),
+        "discord_relay_max_delay": CONFIG.get("discord_relay_max_delay", 1.0),
+        "discord_relay_max_queue": CONFIG.get("discord_relay_max_queue", 500),
+        "log_checkpoint_interval": CONFIG.get("log_checkpoint_interval", 0.5),
+        "log_checkpoint_max_age": CONFIG.get("log_checkpoint_max_age", 600),
+        "boot_scan_max_bytes": CONFIG.get("boot_scan_max_bytes", 8388608),
+        "claims_commit_window": CONFIG.get("claims_commit_window", 0.02),
+        "claims_checkpoint_interval": CONFIG.get("claims_checkpoint_interval", 300),
+        "reward_watch_interval": CONFIG.get("reward_watch_interval", 5),
+        "storage_io_workers": CONFIG.get("storage_io_workers", 2),
+        "claim_delivery_workers": CONFIG.get("claim_delivery_workers", 2),
+        "claim_batch_window": CONFIG.get("claim_batch_window", 0.1),
+        "claim_batch_max": CONFIG.get("claim_batch_max", 8),
+        "claim_queue_max": CONFIG.get("claim_queue_max", 200),
+        "server_process_match": CONFIG.get("server_process_match"),
+        "health_probe_timeout": CONFIG.get("health_probe_timeout", 5),
+        "health_failure_threshold": CONFIG.get("health_failure_threshold", 3),
+        "health_slow_probe": CONFIG.get("health_slow_probe", 1.0),
+        "health_degraded_interval": CONFIG.get("health_degraded_interval", 1),
+        "perf_sample_interval": CONFIG.get("perf_sample_interval", 10),
+        "perf_history": CONFIG.get("perf_history", 720),
+        "perf_command": CONFIG.get("perf_command"),
+        "hoststats_cpu_alert": CONFIG.get("hoststats_cpu_alert", 90),
+        "hoststats_rss_alert_mb": CONFIG.get("hoststats_rss_alert_mb"),
+        "hoststats_alert_window": CONFIG.get("hoststats_alert_window", 120)
     }
 
-    config_path = CONFIG["config_file"]
+def write_config_file(config_path: str, config_to_save: dict):
     backup_path = config_path + ".bak"
     temp_path = config_path + ".tmp"
 
@@ -271,6 +1856,23 @@ def save_config():
         # Cleanup temp file on failure
         if os.path.exists(temp_path):
             os.remove(temp_path)
+        raise
+
+def save_config():
+    """Blocking save, for startup before the event loop runs."""
+    try:
+        write_config_file(CONFIG["config_file"], config_snapshot())
+    except Exception:
+        pass  # Already logged
+
+async def persist_config():
+    """Save from a command handler: off the loop, serialized and coalesced with other saves."""
+    writer = get_file_writer(CONFIG["config_file"], write_config_file)
+    try:
+        await writer.write(config_snapshot())
+    except Exception:
+        pass  # Already logged
+
 
 def load_config():
     config_file = CONFIG["config_file"]
@@ -304,7 +1906,39 @@ def load_config():
         "thread_id": None,
         "message_id": None,
         "status_channel_id": None,
-        "server_check_interval": 60
+        "server_check_interval": 60,
+        "rcon_max_sessions": 2,
+        "rcon_timeout": 10,
+        "rcon_keepalive_interval": 60,
+        "query_timeout": 5,
+        "player_snapshot_ttl": 10,
+        "chat_relay_window": 0.25,
+        "chat_relay_max_queue": 200,
+        "chat_relay_overflow": "merge",
+        "discord_relay_max_delay": 1.0,
+        "discord_relay_max_queue": 500,
+        "log_checkpoint_interval": 0.5,
+        "log_checkpoint_max_age": 600,
+        "boot_scan_max_bytes": 8388608,
+        "claims_commit_window": 0.02,
+        "claims_checkpoint_interval": 300,
+        "reward_watch_interval": 5,
+        "storage_io_workers": 2,
+        "claim_delivery_workers": 2,
+        "claim_batch_window": 0.1,
+        "claim_batch_max": 8,
+        "claim_queue_max": 200,
+        "server_process_match": None,
+        "health_probe_timeout": 5,
+        "health_failure_threshold": 3,
+        "health_slow_probe": 1.0,
+        "health_degraded_interval": 1,
+        "perf_sample_interval": 10,
+        "perf_history": 720,
+        "perf_command": None,
+        "hoststats_cpu_alert": 90,
+        "hoststats_rss_alert_mb": None,
+        "hoststats_alert_window": 120
     }
 
     # Load all values using defaults when missing
@@ -324,190 +1958,157 @@ def load_config():
     else:
         logger.info("✅ Configuration loaded successfully.")
 
-def is_rcon_alive(wait_until_online=False, delay=5):
-    attempt = 1
-    while True:
-        try:
-            with MCRcon(CONFIG["server_ip"], CONFIG["rcon_password"], port=int(CONFIG["rcon_port"])) as mcr:
-                response = mcr.command("list")
-                if response:
-                    return True
-                else:
-                    logger.warning("⚠️ RCON responded but returned empty.")
-                    if not wait_until_online:
-                        return False
-        except Exception as e:
-            logger.debug(f"⏳ Attempt {attempt}: RCON not ready ({e})")
-            if not wait_until_online:
-                return False
-
-        logger.info(f"🔄 Retrying RCON connection in {delay} seconds...")
-        time.sleep(delay)
-        attempt += 1
-
-def query_server(wait_until_online=False, delay=5):
-    if not CONFIG.get("server_ip") or not CONFIG.get("server_port"):
-        logger.error("❌ Cannot query server: Missing IP or port in config.")
-        return {"online": False, "error": "Missing server config"}
-
-    attempt = 1
-    while True:
-        try:
-            server = JavaServer(CONFIG["server_ip"], CONFIG["server_port"])
-            status = server.status()
-            logger.info(f"✅ Server is online. {status.players.online} player(s) currently.")
-            return {
-                "online": True,
-                "players_online": status.players.online,
-                "players_sample": getattr(status.players, "sample", []),
-                "latency": round(status.latency),
-                "favicon": getattr(status, "favicon", None),  #  Safe access
-                "motd": getattr(status, "description", "No MOTD")  
-            }
-
-        except Exception as e:
-            if wait_until_online:
-                logger.debug(f"⏳ Attempt {attempt}: Server query failed ({e})")
-                logger.info(f"🔄 Retrying query in {delay} seconds...")
-                time.sleep(delay)
-                attempt += 1
-            else:
-                logger.error(f"❌ Server query failed: {e}")
-                return {"online": False, "error": str(e)}
-
-def send_to_minecraft_chat(msg: str) -> bool:
-    if not all([CONFIG.get("server_ip"), CONFIG.get("rcon_port"), CONFIG.get("rcon_password")]):
-        logger.error("❌ Missing RCON configuration. Cannot send message to Minecraft chat.")
-        return False
-
-    try:
-        with MCRcon(CONFIG["server_ip"], CONFIG["rcon_password"], port=int(CONFIG["rcon_port"])) as m:
-            tellraw_json = json.dumps([
-                {"text": "[Discord] ", "color": "blue", "bold": True},
-                {"text": msg, "color": "gray"}
-            ])
-            m.command(f'tellraw @a {tellraw_json}')
-            logger.info(f"📨 Sent message to Minecraft chat: {msg}")
-        return True
-    except Exception as e:
-        logger.error(f"❌ Failed to send RCON message: {e}")
-        return False
-
-def get_online_players_rcon():
+async def get_online_players_rcon():
     if not all([CONFIG.get("server_ip"), CONFIG.get("rcon_port"), CONFIG.get("rcon_password")]):
         logger.error("❌ Missing RCON configuration. Cannot fetch online players.")
         return {"count": -1, "names": []}
 
     try:
-        with MCRcon(CONFIG["server_ip"], CONFIG["rcon_password"], port=int(CONFIG["rcon_port"])) as m:
-            response = m.command("list")
-            logger.debug(f"📄 Full RCON Response: {response}")
-
-            match = re.search(r"There are (\d+) of a max of \d+ players online(?:: (.*))?", response)
-            if match:
-                count = int(match.group(1))
-                names = match.group(2)
-                name_list = [n.strip() for n in names.split(",")] if names else []
-                logger.info(f"👥 Online players via RCON: {count} — {name_list}")
-                return {"count": count, "names": name_list}
-            else:
-                logger.warning("⚠️ Could not parse RCON player list response.")
-                return {"count": 0, "names": []}
+        snapshot = await player_snapshots.get()
+        logger.info(f"👥 Online players via RCON: {snapshot.count} — {snapshot.names} ({snapshot.age:.1f}s old)")
+        return {"count": snapshot.count, "names": snapshot.names}
     except Exception as e:
         logger.error(f"❌ RCON player list error: {e}")
         return {"count": -1, "names": []}
     
-def get_minecraft_start_time():
-    # ✅ Use cached start time if available
-    cached = load_cached_server_start_time()
-    if cached:
-        logger.info(f"📦 Loaded cached server start time: {cached}")
-        return cached
-
-    # 🧾 Continue with log scanning...
-    log_dir = Path("H:/Wanderlust Unbound Lite Server/logs")
-    log_files = sorted(log_dir.glob("*.log*"), key=os.path.getmtime, reverse=True)
-
-    def extract_start_time_from_log(path: Path):
-        try:
-            is_gzip = path.suffix == ".gz"
-            open_func = gzip.open if is_gzip else open
-            mode = "rt" if is_gzip else "r"
-
-            with open_func(path, mode, encoding="utf-8", errors="replace") as file:
-                for line in file:
-                    if "Done (" in line and "For help, type" in line:
-                        match = re.search(r'\[(\d{2}[A-Za-z]{3}\d{4}) (\d{2}:\d{2}:\d{2})\.\d+\]', line)
-                        if match:
-                            full_str = f"{match.group(1)} {match.group(2)}"
-                            try:
-                                dt = datetime.strptime(full_str, "%d%b%Y %H:%M:%S")
-                                logger.info(f"🕰️ Boot time found in {path.name}: {full_str}")
-                                save_server_start_time(dt.timestamp())
-                                return dt.timestamp()
-                            except ValueError as ve:
-                                logger.warning(f"⛔ Date parse error in {path.name}: {ve}")
-        except Exception as e:
-            logger.error(f"❌ Error reading {path.name}: {e}")
-        return None
+async def get_minecraft_start_time():
+    # ✅ Seen live in the log stream — no file access needed
+    if boot_index.live_boot_time:
+        return boot_index.live_boot_time
 
-    logger.info("🔎 Searching for server start time in recent logs...")
-    for log_path in log_files[:5]:
-        logger.debug(f"🔍 Scanning log file: {log_path.name}")
-        timestamp = extract_start_time_from_log(log_path)
-        if timestamp:
-            return timestamp
+    # 🧾 Indexed lookup: reverse scan of latest.log, archives scanned at most once ever
+    logger.info("🔎 Looking up server start time in the boot index...")
+    timestamp = await run_storage_io(boot_index.latest_boot_time)
+    if timestamp:
+        return timestamp
 
     logger.warning("🔁 Falling back to RCON...")
     try:
-        with MCRcon(CONFIG["server_ip"], CONFIG["rcon_password"], port=int(CONFIG["rcon_port"])) as m:
-            response = m.command("list")
-            if response:
-                now = datetime.now().timestamp()
-                save_server_start_time(now)
-                return now
+        await player_snapshots.get()
+        return datetime.now().timestamp()
     except Exception as e:
         logger.error(f"❌ RCON fallback failed: {e}")
 
     logger.error("❌ Unable to determine server start time.")
     return None
     
-def check_server_ready():
+async def check_server_ready():
     try:
-        with MCRcon(CONFIG["server_ip"], CONFIG["rcon_password"], port=CONFIG["rcon_port"]) as m:
-            response = m.command("list")
-            if "There are" in response:
-                logger.info("✅ Server is ready (RCON responded with player list).")
-                return True
-            else:
-                logger.warning(f"⚠️ Unexpected RCON response: {response}")
-                return False
+        snapshot = await player_snapshots.get()
+        logger.info(f"✅ Server is ready (RCON responded with player list: {snapshot.count}/{snapshot.max_players}).")
+        return True
     except Exception as e:
         logger.warning(f"❌ RCON check failed while checking server readiness: {e}")
         return False
 
-def start_server_watcher():
-    def watch():
+class ServerProcessWatcher:
+    """
+    Finds the server JVM once — a java process whose command line mentions
+    `server_process_match` (e.g. the server jar) or whose working directory
+    is the server folder — then tracks just that PID. On Linux the thread
+    sleeps on a pidfd and wakes the moment the JVM exits; elsewhere it
+    waits on the process handle (Windows) or checks the PID each interval.
+    The process table is only scanned again after the tracked JVM dies.
+    """
+
+    def __init__(self, server_dir: Path):
+        self.server_dir = os.path.normcase(os.path.normpath(str(server_dir)))
+        self.process: Optional[psutil.Process] = None
+        self._pidfd: Optional[int] = None
+        self.stats = {"scans": 0, "scanned": 0, "checks": 0, "pidfd": False}
+
+    def _is_server(self, info: dict) -> bool:
+        if "java" not in (info.get("name") or "").lower():
+            return False
+        cmdline = " ".join(info.get("cmdline") or [])
+        marker = CONFIG.get("server_process_match")
+        if marker:
+            return marker.lower() in cmdline.lower()
+        cwd = info.get("cwd")
+        if cwd and os.path.normcase(os.path.normpath(cwd)) == self.server_dir:
+            return True
+        return self.server_dir in os.path.normcase(cmdline)
+
+    def discover(self) -> Optional[psutil.Process]:
+        """One pass over the process table; returns the server JVM or None."""
+        self.stats["scans"] += 1
+        for proc in psutil.process_iter(["pid", "name", "cmdline", "cwd"]):
+            self.stats["scanned"] += 1
+            try:
+                if self._is_server(proc.info):
+                    return proc
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return None
+
+    def track(self, proc: psutil.Process):
+        self._close_pidfd()
+        self.process = proc
+        if hasattr(os, "pidfd_open"):
+            try:
+                self._pidfd = os.pidfd_open(proc.pid)
+                self.stats["pidfd"] = True
+            except OSError:
+                self._pidfd = None
+        if not proc.is_running():  # PID was reused before the pidfd was opened
+            self._close_pidfd()
+            self.process = None
+            return
+        logger.info(f"🎯 Tracking Minecraft server JVM (PID {proc.pid}).")
+
+    def _close_pidfd(self):
+        if self._pidfd is not None:
+            os.close(self._pidfd)
+            self._pidfd = None
+
+    def wait_for_exit(self, timeout: float) -> bool:
+        """Block up to `timeout` seconds; True once the tracked process is gone."""
+        self.stats["checks"] += 1
+        if self._pidfd is not None:
+            poller = select.poll()
+            poller.register(self._pidfd, select.POLLIN)
+            return bool(poller.poll(timeout * 1000))
+        if sys.platform == "win32":
+            try:
+                self.process.wait(timeout)  # WaitForSingleObject on the process handle
+                return True
+            except psutil.TimeoutExpired:
+                return False
+        time.sleep(timeout)
+        return not self.process.is_running()  # Checks PID and creation time
+
+    def run(self):
         logger.info("👁️ Started server process watcher thread.")
         while True:
             try:
-                alive = any('java' in p.name().lower() for p in psutil.process_iter())
-                if not alive:
-                    logger.warning("🛑 Minecraft server process not found — shutting down bot.")
-                    asyncio.run_coroutine_threadsafe(bot.close(), bot.loop)
-                    break
-                time.sleep(CONFIG["server_check_interval"])
+                if self.process is None:
+                    proc = self.discover()
+                    if proc is None:
+                        logger.warning("🛑 Minecraft server process not found — shutting down bot.")
+                        asyncio.run_coroutine_threadsafe(bot.close(), bot.loop)
+                        break
+                    self.track(proc)
+                    continue
+
+                if self.wait_for_exit(CONFIG["server_check_interval"]):
+                    logger.info(f"🔎 Server JVM (PID {self.process.pid}) exited — looking for a new one.")
+                    self._close_pidfd()
+                    self.process = None
             except Exception as e:
                 logger.error(f"❌ Error in server watcher: {e}")
                 time.sleep(5)  # prevent tight loop on failure
-    threading.Thread(target=watch, daemon=True).start()
+
+server_watcher = ServerProcessWatcher(SERVER_DIR)
+
+def start_server_watcher():
+    threading.Thread(target=server_watcher.run, daemon=True).start()
 
 async def get_minecraft_start_time_with_retry(delay=20, max_attempts=None):
     start_wait = time.time()
     attempt = 1
 
     while True:
-        log_time = get_minecraft_start_time()
+        log_time = await get_minecraft_start_time()
         if log_time:
             BotState.server_start_time = log_time
             duration = int(time.time() - start_wait)
@@ -532,7 +2133,7 @@ async def get_minecraft_start_time_with_retry(delay=20, max_attempts=None):
 
         if max_attempts is not None and attempt > max_attempts:
             logger.error("❌ Max attempts reached. Could not determine server start time.")
-            clear_server_start_cache()
+            boot_index.forget_live()
 
             if BotState.status_channel_id:
                 channel = bot.get_channel(BotState.status_channel_id)
@@ -540,7 +2141,7 @@ async def get_minecraft_start_time_with_retry(delay=20, max_attempts=None):
                     try:
                         await channel.send(
                             f"❌ Failed to determine server start time after `{attempt - 1}` attempts.\n"
-                            f"🧼 Cache cleared — retry manually or check the log."
+                            f"🧼 Boot index for latest.log reset — retry manually or check the log."
                         )
                     except Exception as e:
                         logger.error(f"❌ Failed to send failure message to Discord: {e}")
@@ -565,7 +2166,6 @@ async def change_status():
         logger.error(f"❌ Unexpected error in change_status: {e}", exc_info=True)
 
 async def wait_for_server_ready():
-    clear_server_start_cache()
     await asyncio.sleep(10)
 
     if not BotState.status_channel_id:
@@ -594,8 +2194,8 @@ async def wait_for_server_ready():
     boot_start_time = time.time()
 
     while True:
-        if check_server_ready():
-            log_time = get_minecraft_start_time()
+        if await check_server_ready():
+            log_time = await get_minecraft_start_time()
             if log_time:
                 BotState.server_start_time = log_time
                 readable = datetime.fromtimestamp(log_time).strftime("%Y-%m-%d %H:%M:%S")
@@ -627,56 +2227,102 @@ async def wait_for_server_ready():
         i += 1
         await asyncio.sleep(10)
 
-async def restart_bot_after_midnight_once():
-    await bot.wait_until_ready()
-
-    today = date.today()
-    already_restarted = False
-
-    while True:
-        now = datetime.now()
+class ServerHealthMonitor:
+    """
+    Probes the server with a Server List Ping and an RCON `list` at the same
+    time, each bounded by `health_probe_timeout`. The server counts as down
+    only after `health_failure_threshold` consecutive ticks where every probe
+    failed. While anything looks degraded — a failed probe or one slower than
+    `health_slow_probe` seconds — it probes every `health_degraded_interval`
+    seconds instead of `server_check_interval`.
+    Every probe's latency (None for a failure) goes into a ring buffer, so a
+    struggling server shows up in /botmetrics before it goes down.
+    """
 
-        # ⏱️ Between 12:00:05 AM and 12:01:00 AM, restart if not yet done
-        if now.hour == 0 and now.minute == 0 and now.second >= 5 and not already_restarted:
-            logger.info("🕛 Triggering bot restart after midnight to reattach to new latest.log.")
+    PROBES = ("ping", "rcon")
 
-            if BotState.status_channel_id:
-                channel = bot.get_channel(BotState.status_channel_id)
-                if channel:
-                    try:
-                        await channel.send("🔄 Restarting bot after midnight to reattach to new `latest.log`.")
-                        logger.info("📢 Sent restart notice to Discord.")
-                    except Exception as e:
-                        logger.warning(f"⚠️ Could not send restart notice to Discord: {e}")
+    def __init__(self):
+        self.history = {name: deque(maxlen=360) for name in self.PROBES}  # (timestamp, latency or None)
+        self.consecutive_failures = 0
+        self.degraded = False
+        self.stats = {"ticks": 0, "failed_ticks": 0, "degraded_ticks": 0}
+        self.failures = {name: 0 for name in self.PROBES}
 
-            await asyncio.sleep(1)  # Let Discord send the message
-            logger.info("🔁 Executing self-restart via os.execv()")
-            os.execv(sys.executable, [sys.executable] + sys.argv)
+    async def _probe_ping(self):
+        if not CONFIG.get("server_ip") or not CONFIG.get("server_port"):
+            raise RuntimeError("Missing server config")
+        await ping_server(CONFIG["server_ip"], CONFIG["server_port"])
 
-        # 🔁 Reset the restart flag if the date has changed
-        if now.date() != today:
-            today = now.date()
-            already_restarted = False
-            logger.info("📅 Date changed — reset midnight restart flag.")
+    async def _probe_rcon(self):
+        await player_snapshots.refresh()  # A real `list` round trip, which also refreshes the snapshot
 
-        await asyncio.sleep(1)
+    async def _run_probe(self, name: str) -> Optional[float]:
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(getattr(self, f"_probe_{name}")(), float(CONFIG.get("health_probe_timeout", 5)))
+        except Exception as e:
+            self.failures[name] += 1
+            self.history[name].append((time.time(), None))
+            logger.debug(f"🩺 {name} probe failed: {e!r}")
+            return None
+        latency = time.monotonic() - started
+        self.history[name].append((time.time(), latency))
+        return latency
+
+    async def tick(self) -> bool:
+        """Run every probe concurrently; True if the server answered at least one."""
+        latencies = await asyncio.gather(*(self._run_probe(name) for name in self.PROBES))
+        self.stats["ticks"] += 1
+
+        slow = float(CONFIG.get("health_slow_probe", 1.0))
+        reachable = any(latency is not None for latency in latencies)
+        self.degraded = any(latency is None or latency > slow for latency in latencies)
+        if self.degraded:
+            self.stats["degraded_ticks"] += 1
+
+        if reachable:
+            self.consecutive_failures = 0
+        else:
+            self.consecutive_failures += 1
+            self.stats["failed_ticks"] += 1
+        return reachable
+
+    @property
+    def is_down(self) -> bool:
+        return self.consecutive_failures >= max(1, int(CONFIG.get("health_failure_threshold", 3)))
+
+    def next_interval(self) -> float:
+        if self.degraded:
+            return float(CONFIG.get("health_degraded_interval", 1))
+        return float(CONFIG.get("server_check_interval", 5))
+
+    def metrics(self) -> dict:
+        stats = dict(self.stats)
+        stats["consecutive_failures"] = self.consecutive_failures
+        stats["degraded"] = self.degraded
+        for name, history in self.history.items():
+            latencies = [latency for _, latency in history if latency is not None]
+            stats[f"{name}_failures"] = self.failures[name]
+            stats[f"{name}_p50"] = percentile(latencies, 50)
+            stats[f"{name}_p95"] = percentile(latencies, 95)
+            stats[f"{name}_last"] = history[-1][1] if history else None
+        return stats
+
+server_health = ServerHealthMonitor()
 
 async def monitor_server_shutdown():
     await bot.wait_until_ready()
     logger.info("👁️ Started monitoring for server shutdown...")
 
-    check_interval = CONFIG.get("server_check_interval", 5)
     seen_server_online_once = False
     BotState.server_is_online = False
 
     while True:
         try:
-            status = query_server()
-            server_offline = not status.get("online")
-            rcon_offline = not is_rcon_alive()
+            reachable = await server_health.tick()
 
             # ✅ Server is reachable by ping or RCON
-            if not server_offline or not rcon_offline:
+            if reachable:
                 if not BotState.server_is_online:
                     logger.info("🟢 Server is back online.")
                 BotState.server_is_online = True
@@ -684,6 +2330,15 @@ async def monitor_server_shutdown():
                 if not seen_server_online_once:
                     seen_server_online_once = True
                     logger.info("✅ First confirmed server online state. Beginning shutdown monitoring.")
+                elif server_health.degraded:
+                    logger.debug("🩺 Server health degraded — probing faster.")
+
+            # 🟠 Unreachable, but not for long enough to call it down
+            elif seen_server_online_once and not server_health.is_down:
+                logger.warning(
+                    f"⚠️ Server unreachable (RCON + ping failed), "
+                    f"{server_health.consecutive_failures}/{CONFIG.get('health_failure_threshold', 3)} strikes."
+                )
 
             # 🔴 Server is fully unreachable
             elif seen_server_online_once:  # 🔧 Only shut down *after* we've confirmed it was online once
@@ -691,6 +2346,7 @@ async def monitor_server_shutdown():
                     logger.info("🔴 Server is now unreachable (RCON + ping failed).")
 
                 BotState.server_is_online = False
+                session_tracker.close_all(time.time())
 
                 # Send shutdown message to Discord
                 if BotState.status_channel_id:
@@ -703,7 +2359,7 @@ async def monitor_server_shutdown():
                         except Exception as e:
                             logger.warning(f"⚠️ Failed to send shutdown message to Discord: {e}")
 
-                logger.info("🛑 Closing bot due to immediate server shutdown...")
+                logger.info("🛑 Closing bot due to server shutdown...")
                 await bot.close()
                 break
 
@@ -713,31 +2369,132 @@ async def monitor_server_shutdown():
         except Exception as e:
             logger.error(f"❌ Exception in server shutdown monitor: {e}", exc_info=True)
 
-        await asyncio.sleep(check_interval)
+        await asyncio.sleep(server_health.next_interval())
 
-def load_daily_data():
-    if not os.path.exists(REWARD_FILE):
-        logger.warning(f"⚠️ Reward file not found: {REWARD_FILE}")
-        return {}
+REWARD_ITEM_PREFIX = "numismatic-overhaul:"
 
-    try:
-        with open(REWARD_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            logger.info(f"📦 Loaded daily rewards ({len(data)} entries)")
-            return data
-    except json.JSONDecodeError as e:
-        logger.error(f"❌ Failed to parse {REWARD_FILE}: {e}")
-        # Backup corrupt file
-        backup_path = REWARD_FILE + ".corrupt"
+class Reward(NamedTuple):
+    day: int
+    item: str           # Full item ID for /give
+    amount: int
+    short_item: str     # Item ID without the numismatic-overhaul: prefix
+    display_name: str   # "Gold Coin"
+    sound: str
+
+class RewardSchedule:
+    """Validated, immutable day → Reward mapping compiled from daily_rewards.json."""
+
+    def __init__(self, rewards: dict[int, Reward], signature=None):
+        self.rewards = MappingProxyType(rewards)
+        self.signature = signature
+
+    def get(self, day: int) -> Optional[Reward]:
+        return self.rewards.get(day)
+
+    def __len__(self) -> int:
+        return len(self.rewards)
+
+def compile_reward_schedule(data, signature=None) -> RewardSchedule:
+    """Build a RewardSchedule from parsed JSON; raises ValueError on anything malformed."""
+    if not isinstance(data, dict):
+        raise ValueError("top level must be an object of day → reward")
+
+    rewards = {}
+    for key, entry in data.items():
         try:
-            os.rename(REWARD_FILE, backup_path)
-            logger.warning(f"📦 Corrupt reward file backed up to {backup_path}")
-        except Exception as backup_error:
-            logger.error(f"❌ Failed to backup corrupt reward file: {backup_error}")
-        return {}
-    except Exception as e:
-        logger.exception(f"❌ Unexpected error loading {REWARD_FILE}")
-        return {}
+            day = int(key)
+        except (TypeError, ValueError):
+            raise ValueError(f"day key {key!r} is not a number")
+        if not 1 <= day <= 7:
+            raise ValueError(f"day {day} is outside 1-7")
+        if not isinstance(entry, dict):
+            raise ValueError(f"day {day}: reward must be an object")
+
+        item = entry.get("item")
+        amount = entry.get("amount")
+        if not isinstance(item, str) or not item.strip() or " " in item.strip():
+            raise ValueError(f"day {day}: 'item' must be an item ID like minecraft:diamond")
+        if not isinstance(amount, int) or isinstance(amount, bool) or amount < 1:
+            raise ValueError(f"day {day}: 'amount' must be a positive whole number")
+
+        item = item.strip()
+        rewards[day] = Reward(
+            day=day,
+            item=item,
+            amount=amount,
+            short_item=item.replace(REWARD_ITEM_PREFIX, ""),
+            display_name=item.split(":")[-1].replace("_", " ").title(),
+            sound=STREAK_SOUNDS.get(day, "minecraft:entity.player.levelup"),
+        )
+    return RewardSchedule(rewards, signature)
+
+class RewardScheduleService:
+    """
+    Holds the compiled reward schedule. A background task stats the JSON file
+    every `reward_watch_interval` seconds and swaps in a freshly compiled
+    schedule when it changes; an invalid file keeps the last good schedule.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.schedule = RewardSchedule({})
+        self._task: Optional[asyncio.Task] = None
+        self._rejected_signature = None
+        self._loaded = False
+
+    async def current(self) -> RewardSchedule:
+        if not self._loaded:
+            await run_storage_io(self.reload)
+        return self.schedule
+
+    def _signature(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def reload(self) -> bool:
+        """Recompile if the file changed; returns True when a new schedule was swapped in."""
+        self._loaded = True
+        signature = self._signature()
+        if signature == self.schedule.signature or signature == self._rejected_signature:
+            return False
+
+        if signature is None:
+            logger.warning(f"⚠️ Reward file not found: {self.path} — keeping the current schedule.")
+            self._rejected_signature = None
+            return False
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                schedule = compile_reward_schedule(json.load(f), signature)
+        except (OSError, ValueError) as e:  # json.JSONDecodeError is a ValueError
+            self._rejected_signature = signature
+            logger.error(f"❌ Invalid reward file {self.path}: {e} — keeping the last good schedule.")
+            return False
+
+        self.schedule = schedule  # Single assignment: readers see the old or the new schedule, never a mix
+        self._rejected_signature = None
+        logger.info(f"📦 Loaded daily rewards ({len(schedule)} entries)")
+        return True
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._watch_loop())
+
+    async def _watch_loop(self):
+        while True:
+            await asyncio.sleep(max(1, float(CONFIG.get("reward_watch_interval", 5))))
+            try:
+                await run_storage_io(self.reload)
+            except Exception as e:
+                logger.error(f"❌ Reward schedule reload failed: {e}")
+
+reward_schedule = RewardScheduleService(REWARD_FILE)
+
+async def load_daily_data() -> RewardSchedule:
+    return await reward_schedule.current()
 
 def save_daily_data(data):
     os.makedirs(os.path.dirname(REWARD_FILE), exist_ok=True)
@@ -763,7 +2520,24 @@ def save_daily_data(data):
         if os.path.exists(temp_path):
             os.remove(temp_path)
 
-def get_streak_info(username: str):
+def claim_day(moment: datetime) -> date:
+    """The reward day a moment belongs to: days run from 6 AM to 6 AM in the configured timezone."""
+    local = moment.astimezone(ZoneInfo(CONFIG.get("timezone", "UTC")))
+    reset = local.replace(hour=6, minute=0, second=0, microsecond=0)
+    if local < reset:
+        reset -= timedelta(days=1)
+    return reset.date()
+
+def claim_key(username: str, moment: datetime) -> str:
+    """Idempotency key for one player's grant in one reward day, e.g. "steve:2025-07-01"."""
+    return f"{username.lower()}:{claim_day(moment).isoformat()}"
+
+def claim_week(moment: datetime) -> str:
+    """ISO week of the reward day, e.g. "2025-W27"."""
+    year, week, _ = claim_day(moment).isocalendar()
+    return f"{year}-W{week:02d}"
+
+async def get_streak_info(username: str, store: Optional[ClaimStore] = None):
     tz_name = CONFIG.get("timezone", "UTC")
     tz = ZoneInfo(tz_name)
 
@@ -772,23 +2546,13 @@ def get_streak_info(username: str):
     if now < today_6am:
         today_6am -= timedelta(days=1)
 
-    if not os.path.exists(CLAIMS_FILE):
-        logger.warning(f"⚠️ Claims file not found: {CLAIMS_FILE}")
-        return True, 1, now, None
-
     try:
-        with open(CLAIMS_FILE, "r", encoding="utf-8") as f:
-            claims = json.load(f)
-    except json.JSONDecodeError as e:
-        logger.error(f"❌ Failed to parse claims file: {e}")
-        return True, 1, now, None
-    except Exception as e:
-        logger.error(f"❌ Error loading claims file: {e}")
+        record = await (store or claim_store).aget(username)
+    except sqlite3.Error as e:
+        logger.error(f"❌ Error loading claim for {username}: {e}")
         return True, 1, now, None
 
-    info = claims.get(username, {})
-    last_claim = info.get("last_claim")
-    streak = info.get("streak", 0)
+    last_claim, streak = record if record else (None, 0)
 
     last_dt = None
     if last_claim:
@@ -818,38 +2582,220 @@ def get_streak_info(username: str):
 
     return True, streak, now, last_dt
 
-def update_streak_info(username: str, now: datetime, streak: int):
-    os.makedirs(os.path.dirname(CLAIMS_FILE), exist_ok=True)
+async def update_streak_info(username: str, now: datetime, streak: int, store: Optional[ClaimStore] = None):
+    try:
+        await (store or claim_store).record(username, now.isoformat(), streak)
+        logger.info(f"✅ Updated streak for {username}: streak={streak}, time={now.isoformat()}")
+    except sqlite3.Error as e:
+        # The grant stays reserved, so the reward still can't be claimed twice today
+        logger.error(f"❌ Failed to save claim for {username}: {e}")
+
+class RewardNotDelivered(Exception):
+    """The reward definitely wasn't given; the reservation is released so the player can try again."""
+
+class RewardDeliveryUncertain(Exception):
+    """The reward may or may not have been given; the reservation is kept so it can't be given twice."""
+
+class ClaimAttempt(NamedTuple):
+    status: str  # "granted", "claimed" (already claimed this reward day) or "pending" (grant already reserved)
+    streak: int
+    now: datetime
+    last_claim: Optional[datetime]
+
+async def claim_daily_reward(username: str, deliver, store: Optional[ClaimStore] = None) -> ClaimAttempt:
+    """
+    Check, reserve, deliver and commit one daily claim under the player's lock.
+    `deliver(streak)` gives the reward; it raises RewardNotDelivered (or
+    RconConnectionError) when nothing was given. Any other failure leaves the
+    outcome unknown and is raised as RewardDeliveryUncertain.
+    """
+    store = store or claim_store
+    async with store.lock(username):
+        can_claim, streak, now, last_claim = await get_streak_info(username, store)
+        if not can_claim:
+            return ClaimAttempt("claimed", streak, now, last_claim)
+        if not await store.reserve(username, now):
+            return ClaimAttempt("pending", streak, now, last_claim)
 
-    # Load existing data or initialize
-    claims = {}
-    if os.path.exists(CLAIMS_FILE):
         try:
-            with open(CLAIMS_FILE, "r", encoding="utf-8") as f:
-                claims = json.load(f)
-        except json.JSONDecodeError as e:
-            logger.warning(f"⚠️ Claims file corrupted, overwriting: {e}")
+            await deliver(streak)
+        except (RewardNotDelivered, RconConnectionError):
+            try:
+                await store.release(username, now)
+            except Exception as e:
+                logger.error(f"❌ Failed to release {username}'s reservation; today's claim stays blocked: {e}")
+            raise
+        except RewardDeliveryUncertain as e:
+            logger.error(f"⚠️ Delivery to {username} may have happened; keeping today's grant reserved: {e}")
+            raise
         except Exception as e:
-            logger.error(f"❌ Error reading {CLAIMS_FILE}: {e}")
+            logger.error(f"⚠️ Delivery to {username} may have partly happened; keeping today's grant reserved: {e}")
+            raise RewardDeliveryUncertain(str(e)) from e
 
-    # Update user's claim info
-    claims[username] = {
-        "last_claim": now.isoformat(),
-        "streak": streak
-    }
+        await update_streak_info(username, now, streak, store)
+        return ClaimAttempt("granted", streak, now, last_claim)
 
-    # Safe write via temp file
-    tmp_path = CLAIMS_FILE + ".tmp"
-    try:
-        with open(tmp_path, "w", encoding="utf-8") as f:
-            json.dump(claims, f, indent=2)
+class FakeRconServer:
+    """
+    Local RCON server for benchmarks. It reads the way the vanilla/Forge
+    RCON thread does — one packet per socket read, hanging up on anything
+    else — and answers each command with `handler(command)`, which may
+    return None to leave it unanswered or raise ConnectionError to hang up.
+    """
 
-        os.replace(tmp_path, CLAIMS_FILE)
-        logger.info(f"✅ Updated streak for {username}: streak={streak}, time={now.isoformat()}")
-    except Exception as e:
-        logger.error(f"❌ Failed to save claims to {CLAIMS_FILE}: {e}")
-        if os.path.exists(tmp_path):
-            os.remove(tmp_path)
+    def __init__(self, password: str, handler):
+        self.password = password
+        self.handler = handler
+        self.protocol_errors = []
+        self._server = None
+        self._clients: dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    async def start(self) -> int:
+        self._server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        if self._server:
+            self._server.close()
+        for writer in self._clients.values():
+            writer.close()  # The client loop then sees EOF and exits
+        await asyncio.gather(*self._clients, return_exceptions=True)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._clients[asyncio.current_task()] = writer
+        try:
+            while True:
+                data = await reader.read(1460)
+                if len(data) < 14:
+                    return
+                (length,) = struct.unpack("<i", data[:4])
+                if length != len(data) - 4:
+                    self.protocol_errors.append(f"length {length} != read-4 {len(data) - 4}")
+                    return
+                request_id, packet_type = struct.unpack("<ii", data[4:12])
+                payload = data[12:-2].decode("utf-8")
+                if packet_type == RCON_TYPE_AUTH:
+                    reply_id = request_id if payload == self.password else -1
+                    writer.write(encode_rcon_packet(reply_id, RCON_TYPE_COMMAND, ""))
+                elif packet_type == RCON_TYPE_COMMAND:
+                    reply = await self.handler(payload)
+                    if reply is None:
+                        continue
+                    writer.write(encode_rcon_packet(request_id, RCON_TYPE_RESPONSE, reply))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._clients.pop(asyncio.current_task(), None)
+            writer.close()
+
+async def benchmark_daily_claims(total: int = 500, players: int = 50, p99_ms: int = 2000):
+    """
+    Fire `total` concurrent claims for `players` players (so most are duplicates)
+    through the real delivery queue and RCON pool against a scratch database
+    and a FakeRconServer that sometimes rejects a give, leaves it unanswered
+    (applied or not) or hangs up. Fails on any double grant, protocol
+    violation, or a p99 claim latency above `p99_ms`.
+    """
+    import tempfile
+
+    names = [f"player{i}" for i in range(players)]
+    granted = {name: 0 for name in names}
+
+    class FakeSnapshot:
+        age = 0.0
+
+        def __init__(self):
+            self.names = list(granted)
+
+        def is_online(self, username: str) -> bool:
+            return username in granted
+
+    class FakeSnapshots:
+        async def get(self):
+            return FakeSnapshot()
+
+        refresh = get
+
+    async def run_command(command: str) -> Optional[str]:
+        await asyncio.sleep(random.uniform(0.0005, 0.003))  # Server tick latency
+        give = re.match(r"execute as (\S+) run give ", command)
+        if not give:
+            return ""
+        roll = random.random()
+        if roll < 0.05:
+            return "No player was found"
+        if roll < 0.07:
+            granted[give.group(1)] += 1
+            return None  # Ran, but the reply never came back
+        if roll < 0.08:
+            raise ConnectionResetError("hung up before running it")
+        granted[give.group(1)] += 1
+        return f"Gave 1 [Diamond] to {give.group(1)}"
+
+    server = FakeRconServer("bench", run_command)
+    pool = RconPool(target=("127.0.0.1", await server.start(), "bench"), timeout=0.5)
+    queue = ClaimDeliveryQueue(rcon=pool, snapshots=FakeSnapshots())
+    reward = Reward(1, "minecraft:diamond", 1, "diamond", "Diamond", "minecraft:entity.player.levelup")
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = ClaimStore(Database(os.path.join(directory, "bench.db"), migrate_json=False))
+        latencies = []
+        outcomes = {}
+
+        async def deliver_to(name: str, streak: int):
+            _, done = queue.submit(name, reward, "06:00 AM UTC")
+            await done
+
+        async def one_claim(name: str):
+            started = time.perf_counter()
+            try:
+                attempt = await claim_daily_reward(name, functools.partial(deliver_to, name), store)
+                status = attempt.status
+            except RewardNotDelivered:
+                status = "not delivered"
+            except RewardDeliveryUncertain:
+                status = "uncertain"
+            latencies.append(time.perf_counter() - started)
+            outcomes[status] = outcomes.get(status, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one_claim(random.choice(names)) for _ in range(total)))
+        elapsed = time.perf_counter() - started
+
+        double = [name for name, count in granted.items() if count > 1]
+        held = {row[0] for row in store.db.fetchall("SELECT mc_username FROM claim_grants")}
+        unheld = [name for name, count in granted.items() if count and name not in held]
+        committed = store.db.fetchone("SELECT count(*) FROM claim_grants WHERE status = 'delivered'")[0]
+        store.db.close()
+    pool.close()
+    await server.close()
+
+    p99 = percentile(latencies, 99)
+    print(f"{total} claims for {players} players in {elapsed:.2f}s")
+    for status, count in sorted(outcomes.items()):
+        print(f"  {status}: {count}")
+    print(f"latency p50 {percentile(latencies, 50) * 1000:.0f}ms, p99 {p99 * 1000:.0f}ms (bound {p99_ms}ms), "
+          f"max {max(latencies) * 1000:.0f}ms")
+    print(f"grants given: {sum(granted.values())}, committed: {committed}, double grants: {len(double)}, "
+          f"RCON protocol errors: {len(server.protocol_errors)}")
+    failures = []
+    if double:
+        failures.append(f"double grants for {', '.join(double)}")
+    if unheld:
+        failures.append(f"given without a held claim: {', '.join(unheld)}")
+    if committed > sum(granted.values()):
+        failures.append("more claims committed than grants given")
+    if server.protocol_errors:
+        failures.append(f"server dropped RCON clients ({server.protocol_errors[0]})")
+    if p99 * 1000 > p99_ms:
+        failures.append(f"p99 latency {p99 * 1000:.0f}ms is over {p99_ms}ms")
+    if failures:
+        print(f"❌ FAILED — {'; '.join(failures)}")
+        sys.exit(1)
+
+# Matches "There are 2 of a max of 20 players online: A, B" and the older "2/20" wording
+RCON_LIST_PATTERN = re.compile(r"There are (\d+)(?: of a max of |/)(\d+) players online:?\s*(.*)", re.DOTALL)
 
 def parse_rcon_list_output(output: str):
     """
@@ -859,26 +2805,52 @@ def parse_rcon_list_output(output: str):
 
     Returns:
         {
-            "count": int (online players),
+            "count": int (online players, -1 if unparseable),
+            "max": int (server capacity),
             "names": list of str (player names)
         }
     """
     logger.debug(f"📡 Raw RCON list output: '{output}'")
 
     try:
-        match = re.search(r"There are (\d+) of a max of \d+ players online(?:: (.*))?", output)
+        match = RCON_LIST_PATTERN.search(output)
         if match:
             count = int(match.group(1))
-            names_str = match.group(2)
-            names = [n.strip() for n in names_str.split(",")] if names_str else []
-            logger.info(f"👥 Parsed {count} player(s): {names}")
-            return {"count": count, "names": names}
+            max_players = int(match.group(2))
+            names_str = match.group(3)
+            names = [n.strip() for n in names_str.split(",") if n.strip()] if names_str else []
+            logger.debug(f"👥 Parsed {count}/{max_players} player(s): {names}")
+            return {"count": count, "max": max_players, "names": names}
         else:
             logger.warning(f"⚠️ Could not parse player count from output: '{output}'")
-            return {"count": -1, "names": []}
+            return {"count": -1, "max": 0, "names": []}
     except Exception as e:
         logger.error(f"❌ Failed to parse RCON list output: {e}")
-        return {"count": -1, "names": []}
+        return {"count": -1, "max": 0, "names": []}
+
+def build_reward_commands(username: str, reward: Reward, formatted_reset_time: str) -> list[str]:
+    message_json = json.dumps([
+        {"text": "🎁 ", "color": "gold"},
+        {"text": f"{username}", "color": "yellow"},
+        {"text": " has claimed their daily reward: ", "color": "gold"},
+        {"text": f"{reward.amount}x {reward.short_item}", "color": "aqua"},
+        {"text": "\nType ", "color": "gray"},
+        {"text": "/daily", "color": "blue"},
+        {"text": " in Discord to get yours.", "color": "gray"},
+        {"text": "\n(Link your account with ", "color": "dark_gray"},
+        {"text": "/linkmc <username>", "color": "blue"},
+        {"text": ")", "color": "dark_gray"},
+        {"text": f"\n⏰ Daily resets at {formatted_reset_time}", "color": "gray"}
+    ])
+
+    # Player-specific commands go through `execute as/if`, so they do nothing
+    # if the player turns out to be offline. The give is always first.
+    return [
+        f"execute as {username} run give {username} {reward.item} {reward.amount}",
+        f"execute as {username} at {username} run playsound {reward.sound} player {username} ~ ~ ~ 1 1",
+        *get_fancy_particle_commands(username),
+        f"execute if entity {username} run tellraw @a {message_json}",
+    ]
 
 def get_fancy_particle_commands(username: str) -> list[str]:
     sets = [
@@ -919,167 +2891,1219 @@ def get_fancy_particle_commands(username: str) -> list[str]:
         ]
     ]
 
-    try:
-        selected_set = random.choice(sets)
-        logger.debug(f"✨ Selected particle set for {username}: {selected_set}")
-        return selected_set
-    except Exception as e:
-        logger.error(f"❌ Failed to generate particle commands for {username}: {e}")
-        return []
+    try:
+        selected_set = random.choice(sets)
+        logger.debug(f"✨ Selected particle set for {username}: {selected_set}")
+        return selected_set
+    except Exception as e:
+        logger.error(f"❌ Failed to generate particle commands for {username}: {e}")
+        return []
+
+class ClaimDeliveryQueue:
+    """
+    Admission queue for /daily rewards. A fixed pool of `claim_delivery_workers`
+    workers drains it; each takes up to `claim_batch_max` claims that arrived
+    within `claim_batch_window` seconds, checks who is online once, and gives
+    every online player their reward concurrently, one command sequence per
+    claim, spread across the RCON pool's connections.
+    `rcon` and `snapshots` default to the bot's pool and player snapshots.
+    """
+
+    def __init__(self, rcon=None, snapshots=None):
+        self.rcon = rcon
+        self.snapshots = snapshots
+        self._giving = 0  # Batches mid-delivery; command feedback stays off while any are
+        self._pending = deque()  # (username, reward, reset_text, enqueued_at, future)
+        self._wakeup = asyncio.Event()
+        self._workers: list[asyncio.Task] = []
+        self.waits = deque(maxlen=500)
+        self.deliveries = deque(maxlen=500)
+        self.stats = {"submitted": 0, "delivered": 0, "offline": 0, "failed": 0, "rejected": 0,
+                      "batches": 0, "max_batch": 0, "peak_depth": 0}
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending)
+
+    def submit(self, username: str, reward: Reward, reset_text: str) -> tuple[int, asyncio.Future]:
+        """Queue a delivery; returns (position in queue, future resolved once it's done)."""
+        if len(self._pending) >= max(1, int(CONFIG.get("claim_queue_max", 200))):
+            self.stats["rejected"] += 1
+            raise RewardNotDelivered("🚦 Lots of people are claiming right now — please try again in a minute.")
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((username, reward, reset_text, time.monotonic(), future))
+        self.stats["submitted"] += 1
+        self.stats["peak_depth"] = max(self.stats["peak_depth"], len(self._pending))
+        self._wakeup.set()
+
+        self._workers = [task for task in self._workers if not task.done()]
+        for _ in range(max(1, int(CONFIG.get("claim_delivery_workers", 2))) - len(self._workers)):
+            self._workers.append(asyncio.create_task(self._worker()))
+        return len(self._pending), future
+
+    async def _worker(self):
+        while True:
+            await self._wakeup.wait()
+            if not self._pending:
+                self._wakeup.clear()
+                continue
+
+            # Let the rest of the reset-time burst arrive so it shares one online check
+            await asyncio.sleep(float(CONFIG.get("claim_batch_window", 0.1)))
+            batch = []
+            while self._pending and len(batch) < max(1, int(CONFIG.get("claim_batch_max", 8))):
+                batch.append(self._pending.popleft())
+            if not self._pending:
+                self._wakeup.clear()
+            if not batch:
+                continue
+
+            started = time.monotonic()
+            for *_, enqueued_at, _ in batch:
+                self.waits.append(started - enqueued_at)
+            try:
+                await self._deliver(batch)
+            except Exception as e:
+                self.stats["failed"] += len(batch)
+                logger.error(f"❌ Failed to deliver {len(batch)} daily reward(s): {e}")
+                for *_, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            self.deliveries.append(time.monotonic() - started)
+
+    async def _deliver(self, batch):
+        snapshots = self.snapshots or player_snapshots
+        try:
+            # Cached snapshot first; only force a refresh if someone looks offline (they may have just joined)
+            snapshot = await snapshots.get()
+            if any(not snapshot.is_online(username) for username, *_ in batch):
+                snapshot = await snapshots.refresh()
+        except Exception as e:
+            raise RewardNotDelivered(f"❌ Couldn't reach the Minecraft server: `{e}`") from e
+        logger.debug(f"🧍 Online players: {snapshot.names} ({snapshot.age:.1f}s old)")
+
+        online = []
+        for username, reward, reset_text, _, future in batch:
+            if snapshot.is_online(username):
+                online.append((username, reward, reset_text, future))
+                continue
+            self.stats["offline"] += 1
+            if not future.done():  # Done already if the /daily handler was cancelled
+                future.set_exception(RewardNotDelivered(
+                    f"❌ You are not online in Minecraft as **{username}**.\nPlease join the server first."
+                ))
+        if not online:
+            return
+
+        rcon = self.rcon or rcon_pool
+        self._giving += 1
+        try:
+            if self._giving == 1:
+                await self._command_quietly(rcon, "gamerule sendCommandFeedback false")
+            # One sequence per claim, so a slow or dropped give can't take the rest of the batch with it
+            outcomes = await asyncio.gather(*(
+                self._give(rcon, username, reward, reset_text) for username, reward, reset_text, _ in online
+            ))
+        finally:
+            self._giving -= 1
+            if self._giving == 0:
+                await self._command_quietly(rcon, "gamerule sendCommandFeedback true")
+
+        self.stats["batches"] += 1
+        self.stats["max_batch"] = max(self.stats["max_batch"], len(online))
+        for (username, _, _, future), outcome in zip(online, outcomes):
+            if outcome is None:
+                self.stats["delivered"] += 1
+            else:
+                self.stats["failed"] += 1
+                logger.error(f"❌ Give failed for {username}: {outcome}")
+            if future.done():
+                continue
+            if outcome is None:
+                future.set_result(None)
+            else:
+                future.set_exception(outcome)
+
+    async def _give(self, rcon, username: str, reward: Reward, reset_text: str) -> Optional[Exception]:
+        """Run one claim's reward commands; None if the give ran, else the exception for its claim."""
+        try:
+            results = await rcon.command_batch(build_reward_commands(username, reward, reset_text))
+        except RconConnectionError as e:
+            return RewardNotDelivered(f"❌ Couldn't reach the Minecraft server: `{e}`")
+        except Exception as e:
+            return RewardDeliveryUncertain(f"give failed: {e}")
+        return give_outcome(results[0])  # The give is always first
+
+    @staticmethod
+    async def _command_quietly(rcon, command: str):
+        try:
+            await rcon.command(command)
+        except Exception as e:
+            logger.warning(f"⚠️ {command!r} failed: {e}")
+
+    def metrics(self) -> dict:
+        stats = dict(self.stats)
+        stats["depth"] = self.depth
+        for name, values in (("wait", self.waits), ("delivery", self.deliveries)):
+            for pct in (50, 95, 99):
+                stats[f"{name}_p{pct}"] = percentile(values, pct)
+        return stats
+
+claim_deliveries = ClaimDeliveryQueue()
+
+def give_outcome(result: RconResult) -> Optional[Exception]:
+    """None if the give ran; otherwise the exception telling claim_daily_reward whether to release the grant."""
+    if result.ok:
+        return None
+    if result.sent_but_unanswered:
+        # The command was on the wire, so the item may well have been given
+        return RewardDeliveryUncertain(f"give unanswered: {result.error}")
+    return RewardNotDelivered(f"❌ Failed to issue reward: `give failed: {result.error}`")
+
+async def load_links():
+    """All links as {discord_id (str): mc_username}, the shape the old JSON file had."""
+    try:
+        links = await run_storage_io(link_registry.all)
+        return {str(discord_id): name for discord_id, name in links.items()}
+    except sqlite3.Error as e:
+        logger.error(f"❌ Failed to load linked users: {e}")
+        return {}
+
+# Utility to get linked username from Discord user ID
+async def get_linked_username(discord_id: int):
+    return await run_storage_io(link_registry.get, discord_id)
+
+# Utility to find which Discord user linked a Minecraft username
+async def get_linked_discord_id(mc_username: str):
+    return await run_storage_io(link_registry.find_discord_id, mc_username)
+
+# Set (or update) linked username
+async def set_linked_username(discord_id: int, mc_username: str):
+    await run_storage_io(link_registry.set, discord_id, mc_username)
+    logger.info(f"🔗 Linked Discord ID {discord_id} to Minecraft user '{mc_username}'")
+
+# ---------------------- Log Polling (MC → Discord) ----------------------
+
+log_classifier = LogClassifier(LOG_EVENT_RULES)
+
+def on_boot_event(event: LogEvent):
+    timestamp = parse_log_timestamp(event.timestamp)
+    if timestamp:
+        boot_index.record_live(timestamp)
+        # Anyone still "online" from before the restart never got a leave line
+        session_tracker.close_all(timestamp)
+        logger.info(f"🕰️ Server boot seen in live log: {datetime.fromtimestamp(timestamp)}")
+
+def on_join_event(event: LogEvent):
+    session_tracker.join(event.fields["player"], parse_log_timestamp(event.timestamp) or time.time())
+
+def on_leave_event(event: LogEvent):
+    session_tracker.leave(event.fields["player"], parse_log_timestamp(event.timestamp) or time.time())
+
+# Side effects for event kinds beyond relaying them to Discord
+LOG_EVENT_HANDLERS = {
+    "boot": on_boot_event,
+    "join": on_join_event,
+    "leave": on_leave_event,
+}
+
+def handle_log_line(line):
+    event = log_classifier.classify(line)
+    if event is None:
+        return
+
+    handler = LOG_EVENT_HANDLERS.get(event.kind)
+    if handler:
+        handler(event)
+
+    message = event.render()
+    if message:
+        relay_to_discord(message)
+
+def benchmark_log_classifier(paths: list[str]):
+    """Replay log files (plain or .gz) through the classifier and report lines/sec."""
+    lines = []
+    for path in paths:
+        open_func = gzip.open if path.endswith(".gz") else open
+        with open_func(path, "rt", encoding="utf-8", errors="replace") as f:
+            lines.extend(line.rstrip("\n") for line in f)
+
+    classifier = LogClassifier(LOG_EVENT_RULES)
+    counts = {}
+    started = time.perf_counter()
+    for line in lines:
+        event = classifier.classify(line)
+        if event:
+            counts[event.kind] = counts.get(event.kind, 0) + 1
+    elapsed = time.perf_counter() - started
+
+    rate = len(lines) / elapsed if elapsed else float("inf")
+    print(f"{len(lines)} lines in {elapsed:.3f}s — {rate:,.0f} lines/sec")
+    print(f"rejected by prefix: {classifier.stats['rejected']}, matched: {classifier.stats['matched']}")
+    for kind, count in sorted(counts.items()):
+        print(f"  {kind}: {count}")
+
+IN_MODIFY = 0x00000002
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+INOTIFY_EVENT_HEADER = struct.Struct("iIII")
+
+class InotifyWatch:
+    """Minimal ctypes binding for watching one directory with inotify (Linux only)."""
+
+    def __init__(self, directory: Path):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = IN_MODIFY | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {directory}")
+
+    def wait(self, timeout: float) -> set[str]:
+        """Block until something happens in the directory; returns the affected file names."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        names = set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return names
+        offset = 0
+        while offset + INOTIFY_EVENT_HEADER.size <= len(data):
+            _, _, _, name_len = INOTIFY_EVENT_HEADER.unpack_from(data, offset)
+            offset += INOTIFY_EVENT_HEADER.size
+            names.add(os.fsdecode(data[offset:offset + name_len].rstrip(b"\x00")))
+            offset += name_len
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+class LogFollower:
+    """
+    Tails `latest.log` and hands each complete line to `on_line`.
+    Waits on inotify where available (polling every `log_poll_interval`
+    seconds otherwise) and reopens the file by itself when the server
+    truncates, renames or recreates it.
+
+    Progress is checkpointed to `checkpoint_path` as (inode, byte offset,
+    hash of the last line) so a restart resumes where the previous run
+    stopped instead of skipping to the end.
+    """
+
+    def __init__(self, path: Path, on_line, checkpoint_path: Optional[str] = None):
+        self.path = path
+        self.on_line = on_line
+        self.checkpoint_path = checkpoint_path
+        self.file = None
+        self.identity = None  # (st_dev, st_ino) of the open file
+        self.position = 0
+        self._partial = b""
+        self._last_line = b""
+        self._watch: Optional[InotifyWatch] = None
+        self._saved_offset = None
+        self._saved_at = 0.0
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True, name="log-follower").start()
+
+    def _open(self, from_end: bool) -> bool:
+        try:
+            file = open(self.path, "rb")
+        except FileNotFoundError:
+            return False
+        if self.file:
+            self.file.close()
+        st = os.fstat(file.fileno())
+        self.file = file
+        self.identity = (st.st_dev, st.st_ino)
+        self.position = file.seek(0, os.SEEK_END) if from_end else 0
+        self._partial = b""
+        self._last_line = b""
+        return True
+
+    @property
+    def offset(self) -> int:
+        """Byte offset just past the last complete line handed to `on_line`."""
+        return self.position - len(self._partial)
+
+    def _save_checkpoint(self, force: bool = False):
+        if not self.checkpoint_path or self.identity is None:
+            return
+        now = time.monotonic()
+        interval = float(CONFIG.get("log_checkpoint_interval", 0.5))
+        # Re-save an unchanged offset now and then so the checkpoint's age tracks bot downtime
+        unchanged = self.offset == self._saved_offset
+        if not force and now - self._saved_at < (60.0 if unchanged else interval):
+            return
+
+        checkpoint = {
+            "device": self.identity[0],
+            "inode": self.identity[1],
+            "offset": self.offset,
+            "line_length": len(self._last_line),
+            "line_hash": zlib.crc32(self._last_line),
+            "saved_at": time.time(),
+        }
+        temp_path = self.checkpoint_path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(checkpoint, f)
+            os.replace(temp_path, self.checkpoint_path)
+            self._saved_offset = checkpoint["offset"]
+            self._saved_at = now
+        except OSError as e:
+            logger.warning(f"⚠️ Failed to save log checkpoint: {e}")
+
+    def _load_checkpoint(self) -> Optional[dict]:
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return None
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"⚠️ Ignoring unreadable log checkpoint: {e}")
+            return None
+
+    def _resume(self) -> bool:
+        """Open the log at the checkpoint if it is still valid, otherwise at the end."""
+        checkpoint = self._load_checkpoint()
+        if not self._open(from_end=True):
+            return False
+        if not checkpoint:
+            return True
+
+        age = time.time() - checkpoint.get("saved_at", 0)
+        max_age = float(CONFIG.get("log_checkpoint_max_age", 600))
+        if age > max_age:
+            logger.info(f"⏩ Log checkpoint is {age:.0f}s old (limit {max_age:.0f}s) — skipping to the end.")
+            return True
+
+        size = self.position
+        offset = checkpoint.get("offset", 0)
+        length = checkpoint.get("line_length", 0)
+
+        if (checkpoint.get("device"), checkpoint.get("inode")) != self.identity:
+            # Rotated while we were down: everything in the new file is unseen
+            logger.info(f"📍 {self.path.name} was rotated since the last run — replaying it from the start.")
+            self.file.seek(0)
+            self.position = 0
+            return True
+
+        if offset > size or offset < length + (1 if length or offset else 0):
+            logger.warning("⚠️ Log checkpoint doesn't fit the current file — skipping to the end.")
+            return True
+
+        if offset:
+            self.file.seek(offset - length - 1)
+            last_line = self.file.read(length)
+            if zlib.crc32(last_line) != checkpoint.get("line_hash"):
+                logger.warning("⚠️ Log checkpoint line hash mismatch — skipping to the end.")
+                self.file.seek(size)
+                return True
+            self._last_line = last_line
+
+        self.file.seek(offset)
+        self.position = offset
+        logger.info(f"📍 Resuming {self.path.name} at byte {offset} ({size - offset} bytes behind).")
+        return True
+
+    def _read_available(self):
+        while True:
+            chunk = self.file.read(64 * 1024)
+            if not chunk:
+                return
+            self.position += len(chunk)
+            lines = (self._partial + chunk).split(b"\n")
+            self._partial = lines.pop()
+            for raw in lines:
+                try:
+                    self.on_line(raw.decode("utf-8", errors="replace").strip())
+                except Exception as e:
+                    logger.error(f"❌ Failed to handle log line: {e}")
+            if lines:
+                self._last_line = lines[-1]
+            self._save_checkpoint()
+
+    def _check_rotation(self) -> bool:
+        """Reopen or rewind if the file changed under us; True means read again right away."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return False  # Mid-rotation — wait for the new file to appear
+
+        if (st.st_dev, st.st_ino) != self.identity:
+            self._read_available()  # Drain whatever the old file still had
+            if self._open(from_end=False):
+                logger.info(f"🔁 {self.path.name} was rotated — following the new file.")
+                return True
+        elif st.st_size < self.position:
+            logger.info(f"✂️ {self.path.name} was truncated — reading from the start.")
+            self.file.seek(0)
+            self.position = 0
+            self._partial = b""
+            self._last_line = b""
+            return True
+        return False
+
+    def _wait(self):
+        poll_interval = float(CONFIG.get("log_poll_interval", 1))
+        if self._watch is None:
+            time.sleep(poll_interval)
+            return
+        # The timeout is only a safety net in case an event is missed — or,
+        # with an unsaved offset, the point where the checkpoint catches up
+        timeout = max(poll_interval, 5.0)
+        if self.checkpoint_path and self.offset != self._saved_offset:
+            timeout = float(CONFIG.get("log_checkpoint_interval", 0.5))
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self.path.name in self._watch.wait(remaining):
+                return
+
+    def _run(self):
+        if sys.platform.startswith("linux"):
+            try:
+                self._watch = InotifyWatch(self.path.parent)
+            except (OSError, AttributeError) as e:
+                logger.warning(f"⚠️ inotify unavailable ({e}); falling back to polling.")
+        logger.info(f"📂 Following {self.path} ({'inotify' if self._watch else 'polling'})")
+
+        while self.file is None:
+            if self._resume():
+                break
+            self._wait()
+
+        while True:
+            try:
+                self._read_available()
+                if not self._check_rotation():
+                    self._save_checkpoint()
+                    self._wait()
+            except Exception as e:
+                logger.exception(f"❌ Log follower encountered an error: {e}")
+                time.sleep(5)
+
+log_follower: Optional[LogFollower] = None
+
+def start_log_poller():
+    global log_follower
+    log_path = SERVER_LOG_DIR / "latest.log"
+    if not log_path.exists():
+        logger.warning(f"⚠️ {log_path} does not exist yet — waiting for it to be created.")
+
+    if log_follower is None:
+        os.makedirs(DATA_DIR, exist_ok=True)
+        # Loaded before the follower starts so replayed joins/leaves apply on top of it
+        session_tracker.load()
+        log_follower = LogFollower(log_path, handle_log_line, LOG_CHECKPOINT_FILE)
+        log_follower.start()
+
+def strip_minecraft_formatting(text: str) -> str:
+    return re.sub(r'§[0-9a-fk-or]', '', text, flags=re.IGNORECASE)
+
+# ---------------------- Boot Index ----------------------
+
+BOOT_LINE_MARKER = b"Done ("
+BOOT_LINE_SUFFIX = b"For help, type"
+
+def boot_time_from_line(line: bytes) -> Optional[float]:
+    event = log_classifier.classify(line.decode("utf-8", errors="replace").strip())
+    if event and event.kind == "boot":
+        return parse_log_timestamp(event.timestamp)
+    return None
+
+class BootIndex:
+    """
+    Persistent index of server boot times found in the log directory.
+    Archives are keyed by (path, size, mtime) and scanned at most once; the
+    live `latest.log` is keyed by inode and read backwards from the end,
+    up to `boot_scan_max_bytes`.
+    """
+
+    ARCHIVES_TO_CHECK = 5
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries = None  # file name -> {"size", "mtime", "inode", "boot"}
+        self.live_boot_time: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self.entries is not None:
+            return
+        self.entries = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"⚠️ Rebuilding unreadable boot index: {e}")
+
+    def _save(self):
+        temp_path = self.path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, indent=2)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logger.error(f"❌ Failed to save boot index: {e}")
+
+    def record_live(self, timestamp: float):
+        self.live_boot_time = timestamp
+
+    def forget_live(self):
+        """Drop everything known about latest.log so the next lookup rescans it."""
+        self.live_boot_time = None
+        with self._lock:
+            self._load()
+            if self.entries.pop("latest.log", None) is not None:
+                self._save()
+
+    def latest_boot_time(self) -> Optional[float]:
+        """Most recent boot time on disk. Blocking — call it from a worker thread."""
+        with self._lock:
+            self._load()
+            changed = False
+            try:
+                files = sorted(
+                    (p for p in SERVER_LOG_DIR.glob("*.log*") if p.name != "latest.log"),
+                    key=os.path.getmtime, reverse=True
+                )
+            except OSError as e:
+                logger.error(f"❌ Cannot list {SERVER_LOG_DIR}: {e}")
+                files = []
+
+            live_path = SERVER_LOG_DIR / "latest.log"
+            timestamp, live_changed = self._live_entry(live_path)
+            changed |= live_changed
+
+            if not timestamp:
+                for path in files[:self.ARCHIVES_TO_CHECK]:
+                    timestamp, archive_changed = self._archive_entry(path)
+                    changed |= archive_changed
+                    if timestamp:
+                        break
+
+            # Forget archives that the server has deleted
+            existing = {p.name for p in files} | {"latest.log"}
+            for name in [n for n in self.entries if n not in existing]:
+                del self.entries[name]
+                changed = True
+
+            if changed:
+                self._save()
+            return timestamp
+
+    def _live_entry(self, path: Path):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None, False
+
+        entry = self.entries.get(path.name)
+        # Once latest.log has a Done line it stays valid until the file is replaced
+        if entry and entry.get("inode") == st.st_ino and entry.get("boot"):
+            return entry["boot"], False
+
+        # Same file with no boot yet: only the bytes appended since the last scan are new
+        stop_at = 0
+        if entry and entry.get("inode") == st.st_ino and entry.get("size", 0) <= st.st_size:
+            stop_at = max(0, entry["size"] - 4096)  # Overlap in case the last scan cut a line
+        boot = self._reverse_scan(path, stop_at)
+        self.entries[path.name] = {"size": st.st_size, "mtime": st.st_mtime, "inode": st.st_ino, "boot": boot}
+        return boot, True
+
+    def _archive_entry(self, path: Path):
+        st = os.stat(path)
+        entry = self.entries.get(path.name)
+        if entry and entry.get("size") == st.st_size and entry.get("mtime") == st.st_mtime:
+            return entry.get("boot"), False
+
+        logger.debug(f"🔍 Indexing boot time in {path.name}")
+        boot = None
+        try:
+            open_func = gzip.open if path.suffix == ".gz" else open
+            with open_func(path, "rb") as f:
+                for line in f:
+                    if BOOT_LINE_MARKER in line and BOOT_LINE_SUFFIX in line:
+                        boot = boot_time_from_line(line) or boot
+        except (OSError, EOFError) as e:
+            logger.error(f"❌ Error reading {path.name}: {e}")
+        self.entries[path.name] = {"size": st.st_size, "mtime": st.st_mtime, "boot": boot}
+        return boot, True
+
+    def _reverse_scan(self, path: Path, stop_at: int = 0) -> Optional[float]:
+        """Read backwards in blocks (not before `stop_at`) and return the last boot in the file, if any."""
+        max_bytes = int(CONFIG.get("boot_scan_max_bytes", 8 * 1024 * 1024))
+        block_size = 64 * 1024
+        with open(path, "rb") as f:
+            end = f.seek(0, os.SEEK_END)
+            tail = b""
+            scanned = 0
+            while end > stop_at and scanned < max_bytes:
+                start = max(stop_at, end - block_size)
+                f.seek(start)
+                block = f.read(end - start) + tail
+                scanned += end - start
+                end = start
+                lines = block.split(b"\n")
+                # The first piece may be cut mid-line — keep it for the next block
+                tail = lines.pop(0) if start > 0 else b""
+                for line in reversed(lines):
+                    if BOOT_LINE_MARKER in line and BOOT_LINE_SUFFIX in line:
+                        boot = boot_time_from_line(line)
+                        if boot:
+                            return boot
+        return None
 
-def load_links():
-    if not os.path.exists(LINKED_FILE):
-        return {}
-    with open(LINKED_FILE, "r") as f:
+boot_index = BootIndex(BOOT_INDEX_FILE)
+
+# ---------------------- Playtime Sessions ----------------------
+
+class SessionTracker:
+    """
+    Per-player play sessions built from join/leave log events.
+    Every change is appended to a compact tab-separated log (J/L/C lines,
+    plus T lines for compacted totals) that is replayed at startup.
+    Ranked queries are served from a sorted (-seconds, name) index that
+    is updated as each session closes. The lock is only held for in-memory
+    updates and single-line appends; compaction writes from a snapshot.
+    """
+
+    COMPACT_AFTER_LINES = 20000
+
+    def __init__(self, path: str):
+        self.path = path
+        self.totals = {}        # key -> closed seconds
+        self.sessions = {}      # key -> session count
+        self.names = {}         # key -> display name as last seen in the log
+        self.open = {}          # key -> join timestamp
+        self.ranking = []       # sorted [(-total, key)]
+        self._lines = 0
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._compacting = False
+
+    @staticmethod
+    def _key(name: str) -> str:
+        return name.lower()
+
+    def _set_total(self, key: str, total: float):
+        old = self.totals.get(key)
+        if old is not None:
+            index = bisect.bisect_left(self.ranking, (-old, key))
+            if index < len(self.ranking) and self.ranking[index] == (-old, key):
+                self.ranking.pop(index)
+        self.totals[key] = total
+        bisect.insort(self.ranking, (-total, key))
+
+    def _apply(self, op: str, ts: float, name: str = "", extra: str = ""):
+        key = self._key(name)
+        if op == "J":
+            self.names[key] = name
+            self.open.setdefault(key, ts)  # A duplicate join keeps the original start
+        elif op == "L":
+            start = self.open.pop(key, None)
+            if start is not None and ts >= start:
+                self._set_total(key, self.totals.get(key, 0.0) + ts - start)
+                self.sessions[key] = self.sessions.get(key, 0) + 1
+        elif op == "C":
+            for open_key in list(self.open):
+                self._apply("L", ts, self.names.get(open_key, open_key))
+        elif op == "T":
+            self.names[key] = name
+            self.sessions[key] = int(extra or 0)
+            self._set_total(key, ts)
+
+    def _append(self, *fields):
         try:
-            return json.load(f)
-        except json.JSONDecodeError as e:
-            logger.error(f"❌ Failed to load linked users: {e}")
-            return {}
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("\t".join(str(x) for x in fields) + "\n")
+            self._lines += 1
+        except OSError as e:
+            logger.error(f"❌ Failed to append to session log: {e}")
+
+    def load(self):
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            if not os.path.exists(self.path):
+                return
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        parts = line.rstrip("\n").split("\t")
+                        if len(parts) < 2:
+                            continue
+                        self._lines += 1
+                        try:
+                            self._apply(parts[0], float(parts[1]), *parts[2:4])
+                        except ValueError:
+                            logger.warning(f"⚠️ Skipping bad session log line: {line.strip()!r}")
+            except OSError as e:
+                logger.error(f"❌ Failed to read session log: {e}")
+                return
+            logger.info(f"⏱️ Loaded playtime for {len(self.totals)} player(s), {len(self.open)} online.")
+        self._maybe_compact()
+
+    def _maybe_compact(self):
+        """
+        Rewrite the log as one T line per player plus the still-open sessions
+        once it grows past COMPACT_AFTER_LINES. Call without holding the lock:
+        it snapshots under the lock, writes outside it, and only takes the
+        lock again to carry over lines appended meanwhile and swap the file.
+        """
+        if self._lines <= self.COMPACT_AFTER_LINES:
+            return
+        with self._lock:
+            if self._compacting or self._lines <= self.COMPACT_AFTER_LINES:
+                return
+            self._compacting = True
+            rows = [f"T\t{total}\t{self.names.get(key, key)}\t{self.sessions.get(key, 0)}\n"
+                    for key, total in self.totals.items()]
+            rows += [f"J\t{start}\t{self.names.get(key, key)}\n" for key, start in self.open.items()]
+            try:
+                offset = os.path.getsize(self.path)
+            except OSError:
+                offset = 0
 
-def save_links(data):
-    os.makedirs(DATA_DIR, exist_ok=True)
-    with open(LINKED_FILE, "w") as f:
-        json.dump(data, f, indent=4)
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.writelines(rows)
+            with self._lock:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    f.seek(offset)
+                    tail = f.readlines()
+                with open(temp_path, "a", encoding="utf-8") as f:
+                    f.writelines(tail)
+                os.replace(temp_path, self.path)
+                self._lines = len(rows) + len(tail)
+            logger.info(f"🗜️ Compacted session log to {len(rows) + len(tail)} line(s).")
+        except OSError as e:
+            logger.error(f"❌ Failed to compact session log: {e}")
+        finally:
+            self._compacting = False
+
+    def join(self, name: str, ts: float):
+        with self._lock:
+            self._apply("J", ts, name)
+            self._append("J", ts, name)
+        self._maybe_compact()
+
+    def leave(self, name: str, ts: float):
+        with self._lock:
+            self._apply("L", ts, name)
+            self._append("L", ts, name)
+        self._maybe_compact()
+
+    def close_all(self, ts: float):
+        """Server went down (or rebooted) without leave lines for everyone still online."""
+        with self._lock:
+            if not self.open:
+                return
+            logger.info(f"⏱️ Closing {len(self.open)} dangling session(s).")
+            self._apply("C", ts)
+            self._append("C", ts)
+        # Also called from the event loop, so compaction is left to the next join/leave
+
+    def playtime(self, name: str, now: Optional[float] = None) -> tuple[float, int, bool]:
+        """(total seconds including the live session, closed session count, online)."""
+        now = now or time.time()
+        key = self._key(name)
+        with self._lock:
+            total = self.totals.get(key, 0.0)
+            start = self.open.get(key)
+            if start is not None:
+                total += max(0.0, now - start)
+            return total, self.sessions.get(key, 0), start is not None
+
+    def rank(self, name: str) -> Optional[int]:
+        key = self._key(name)
+        with self._lock:
+            total = self.totals.get(key)
+            if total is None:
+                return None
+            return bisect.bisect_left(self.ranking, (-total, key)) + 1
+
+    def leaderboard(self, limit: int = 10, now: Optional[float] = None) -> list[tuple[str, float, bool]]:
+        """Top `limit` players as (name, seconds, online); live sessions count toward the total."""
+        now = now or time.time()
+        with self._lock:
+            # Only online players can move up, so the top of the index plus them is enough
+            candidates = {key for _, key in self.ranking[:limit]} | set(self.open)
+            rows = []
+            for key in candidates:
+                total = self.totals.get(key, 0.0)
+                start = self.open.get(key)
+                if start is not None:
+                    total += max(0.0, now - start)
+                rows.append((total, key, start is not None))
+        rows.sort(key=lambda row: (-row[0], row[1]))
+        return [(self.names.get(key, key), total, online) for total, key, online in rows[:limit]]
+
+    def player_count(self) -> int:
+        return len(set(self.totals) | set(self.open))
+
+session_tracker = SessionTracker(SESSIONS_FILE)
+
+def format_duration(seconds: float) -> str:
+    minutes = int(seconds) // 60
+    hours, minutes = divmod(minutes, 60)
+    days, hours = divmod(hours, 24)
+    if days:
+        return f"{days}d {hours}h {minutes}m"
+    if hours:
+        return f"{hours}h {minutes}m"
+    return f"{minutes}m"
+
+# ---------------------- Server Performance ----------------------
+
+# `forge tps`: "Dim minecraft:overworld (minecraft:overworld): Mean tick time: 1.234 ms. Mean TPS: 20.000"
+FORGE_TPS_PATTERN = re.compile(
+    r"(?:Dim\s+(?P<dim>\S+)(?:\s*\([^)]*\))?|(?P<overall>Overall))\s*:\s*"
+    r"Mean tick time:\s*(?P<mspt>[\d.]+)\s*ms\.?\s*Mean TPS:\s*(?P<tps>[\d.]+)"
+)
+# `neoforge tps`: "minecraft:overworld: 20.000 TPS (1.234 ms/tick)"
+NEOFORGE_TPS_PATTERN = re.compile(
+    r"(?P<dim>[\w:./-]+)\s*:\s*(?P<tps>[\d.]+)\s*TPS\s*\((?P<mspt>[\d.]+)\s*ms/tick\)"
+)
+# `tick query` (vanilla 1.20.3+): "Target tick rate: 20.0 per second." / "Average time per tick: 1.2ms"
+VANILLA_TICK_RATE_PATTERN = re.compile(r"Target tick rate:\s*(?P<rate>[\d.]+)")
+VANILLA_MSPT_PATTERN = re.compile(r"Average time per tick:\s*(?P<mspt>[\d.]+)\s*ms")
+
+PERF_COMMANDS = ("forge tps", "neoforge tps", "tick query")
+OVERALL_DIMENSION = "overall"
+SPARKLINE_BARS = "▁▂▃▄▅▆▇█"
+
+def parse_tick_report(response: str) -> dict[str, tuple[float, float]]:
+    """{dimension: (tps, mspt)} from any supported command's output; empty if unrecognised."""
+    response = re.sub(r"§.", "", response)  # Formatting codes some servers leave in console output
+    samples = {}
+    for match in FORGE_TPS_PATTERN.finditer(response):
+        dim = OVERALL_DIMENSION if match.group("overall") else match.group("dim")
+        samples[dim] = (float(match.group("tps")), float(match.group("mspt")))
+    if samples:
+        return samples
+
+    for match in NEOFORGE_TPS_PATTERN.finditer(response):
+        dim = match.group("dim")
+        samples[OVERALL_DIMENSION if dim.lower() == "overall" else dim] = (float(match.group("tps")), float(match.group("mspt")))
+    if samples:
+        return samples
+
+    mspt = VANILLA_MSPT_PATTERN.search(response)
+    if mspt:
+        rate = VANILLA_TICK_RATE_PATTERN.search(response)
+        target = float(rate.group("rate")) if rate else 20.0
+        value = float(mspt.group("mspt"))
+        samples[OVERALL_DIMENSION] = (min(target, 1000 / value) if value > 0 else target, value)
+    return samples
+
+class TickRing:
+    """Fixed-capacity ring buffer of (timestamp, tps, mspt) samples backed by preallocated arrays."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.ts = array("d", bytes(8 * capacity))
+        self.tps = array("d", bytes(8 * capacity))
+        self.mspt = array("d", bytes(8 * capacity))
+        self.head = 0   # Next slot to write
+        self.count = 0
+
+    def append(self, ts: float, tps: float, mspt: float):
+        self.ts[self.head] = ts
+        self.tps[self.head] = tps
+        self.mspt[self.head] = mspt
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def latest(self) -> Optional[tuple[float, float, float]]:
+        if not self.count:
+            return None
+        i = (self.head - 1) % self.capacity
+        return self.ts[i], self.tps[i], self.mspt[i]
+
+    def window(self, since: float) -> tuple[list[float], list[float]]:
+        """(tps values, mspt values) for samples at or after `since`, oldest first."""
+        tps, mspt = [], []
+        start = (self.head - self.count) % self.capacity
+        for offset in range(self.count):
+            i = (start + offset) % self.capacity
+            if self.ts[i] >= since:
+                tps.append(self.tps[i])
+                mspt.append(self.mspt[i])
+        return tps, mspt
+
+def sparkline(values: list[float], width: int = 30, low: Optional[float] = None, high: Optional[float] = None) -> str:
+    """Bucket `values` into at most `width` bars; each bar is the bucket's worst (lowest) value."""
+    if not values:
+        return ""
+    n = min(width, len(values))
+    points = [min(values[i * len(values) // n:(i + 1) * len(values) // n]) for i in range(n)]
+    low = min(points) if low is None else low
+    high = max(points) if high is None else high
+    span = (high - low) or 1.0
+    return "".join(
+        SPARKLINE_BARS[max(0, min(len(SPARKLINE_BARS) - 1, int((p - low) / span * (len(SPARKLINE_BARS) - 1))))]
+        for p in points
+    )
 
-# Utility to get linked username from Discord user ID
-def get_linked_username(discord_id: int):
-    links = load_links()
-    return links.get(str(discord_id))
+class PerfSampler:
+    """
+    Polls tick timing over RCON every `perf_sample_interval` seconds. The
+    first command that parses (`forge tps`, `neoforge tps`, then vanilla
+    `tick query`) is remembered; `perf_command` pins one instead. Samples go
+    into one TickRing per dimension, holding `perf_history` samples each.
+    """
 
-# Set (or update) linked username
-def set_linked_username(discord_id: int, mc_username: str):
-    links = load_links()
-    links[str(discord_id)] = mc_username
-    save_links(links)
-    logger.info(f"🔗 Linked Discord ID {discord_id} to Minecraft user '{mc_username}'")
+    def __init__(self):
+        self.rings: dict[str, TickRing] = {}
+        self.command: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"samples": 0, "failures": 0, "unparsed": 0}
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _query(self) -> dict[str, tuple[float, float]]:
+        pinned = CONFIG.get("perf_command")
+        candidates = [pinned] if pinned else ([self.command] if self.command else PERF_COMMANDS)
+        for command in candidates:
+            samples = parse_tick_report(await rcon_pool.command(command))
+            if samples:
+                if self.command != command:
+                    logger.info(f"📊 Sampling tick timing with `{command}`.")
+                self.command = command
+                return samples
+
+        # A remembered command can stop working after a modpack change; search again next time
+        self.command = None
+        self.stats["unparsed"] += 1
+        return {}
 
-# ---------------------- Log Polling (MC → Discord) ----------------------
+    def record(self, samples: dict[str, tuple[float, float]], ts: Optional[float] = None):
+        ts = ts or time.time()
+        capacity = max(10, int(CONFIG.get("perf_history", 720)))
+        for dim, (tps, mspt) in samples.items():
+            ring = self.rings.get(dim)
+            if ring is None:
+                ring = self.rings[dim] = TickRing(capacity)
+            ring.append(ts, tps, mspt)
+        self.stats["samples"] += 1
+
+    async def _run(self):
+        while True:
+            try:
+                samples = await self._query()
+                if samples:
+                    self.record(samples)
+            except Exception as e:
+                self.stats["failures"] += 1
+                logger.debug(f"📊 Tick sample failed: {e}")
+            await asyncio.sleep(max(1.0, float(CONFIG.get("perf_sample_interval", 10))))
+
+    def dimensions(self) -> list[str]:
+        """Overall first, then the rest alphabetically."""
+        return sorted(self.rings, key=lambda dim: (dim != OVERALL_DIMENSION, dim))
+
+    def summary(self, dim: str, window: float, now: Optional[float] = None) -> Optional[dict]:
+        ring = self.rings.get(dim)
+        latest = ring.latest() if ring else None
+        if latest is None:
+            return None
+        tps, mspt = ring.window((now or time.time()) - window)
+        if not tps:
+            tps, mspt = [latest[1]], [latest[2]]
+        return {
+            "tps": latest[1],
+            "mspt": latest[2],
+            "age": (now or time.time()) - latest[0],
+            "tps_min": min(tps),
+            "tps_avg": sum(tps) / len(tps),
+            "tps_p95": percentile(tps, 5),  # The slow end: 95% of samples were at least this fast
+            "mspt_avg": sum(mspt) / len(mspt),
+            "mspt_p95": percentile(mspt, 95),
+            "mspt_max": max(mspt),
+            "samples": len(tps),
+            "sparkline": sparkline(tps, low=0.0, high=max(20.0, max(tps))),
+        }
 
-def handle_log_line(line):
-    # Chat messages
-    chat_match = re.search(r'<(.+?)> (.+)', line)
-    if chat_match:
-        player, msg = chat_match.groups()
-        asyncio.run_coroutine_threadsafe(
-            send_to_discord_chat(f"💬 **{player}**: {msg}"),
-            bot.loop
-        )
-        return
+perf_sampler = PerfSampler()
 
-    # Player joined
-    join_match = re.search(r'\[.+\]: (.+) joined the game', line)
-    if join_match:
-        player = join_match.group(1)
-        asyncio.run_coroutine_threadsafe(
-            send_to_discord_chat(f"➕ **{player}** joined the game"),
-            bot.loop
-        )
-        return
+# ---------------------- Host Resources ----------------------
 
-    # Player left
-    leave_match = re.search(r'\[.+\]: (.+) left the game', line)
-    if leave_match:
-        player = leave_match.group(1)
-        asyncio.run_coroutine_threadsafe(
-            send_to_discord_chat(f"➖ **{player}** left the game"),
-            bot.loop
-        )
-        return
+HOST_STAT_COLUMNS = ("cpu", "rss", "threads", "fds", "load", "mem_available")
 
-    # Advancements (covering all 3 types: advancement, challenge, goal)
-    adv_match = re.search(
-        r'\[.+\]: (.+) has (?:made the advancement|completed the challenge|reached the goal) \[(.+)\]',
-        line
-    )
-    if adv_match:
-        player, advancement = adv_match.groups()
-        asyncio.run_coroutine_threadsafe(
-            send_to_discord_chat(f"🏅 **{player}** earned advancement **{advancement}**!"),
-            bot.loop
-        )
-        return
-    
-    # Player death (improved match for typical and custom death messages)
-    death_match = re.search(
-        r'\[Server thread/INFO\] \[minecraft/MinecraftServer\]: ([\w\d_]+) (was|fell|drowned|died|blew up|tried|walked|hit|went|got|discovered|suffocated|starved|froze|burned|shot|killed|crashed|squashed|impaled|froze to death)(.*)',
-        line
-    )
-    if death_match:
-        clean_msg = re.search(r'\[minecraft/MinecraftServer\]: (.+)', line)
-        if clean_msg:
-            asyncio.run_coroutine_threadsafe(
-                send_to_discord_chat(f"💀 {clean_msg.group(1)}"),
-                bot.loop
-            )
-        return
+class SeriesRing:
+    """Fixed-capacity ring buffer of timestamped rows, one preallocated array('d') per column."""
 
-async def send_to_discord_chat(message: str):
-    if not BotState.status_channel_id:
-        logger.warning("⚠️ No status channel ID set — cannot send message.")
-        return
+    def __init__(self, columns: tuple[str, ...], capacity: int):
+        self.capacity = capacity
+        self.ts = array("d", bytes(8 * capacity))
+        self.columns = {name: array("d", bytes(8 * capacity)) for name in columns}
+        self.head = 0
+        self.count = 0
 
-    channel = bot.get_channel(BotState.status_channel_id)
-    if not channel:
-        logger.warning(f"⚠️ Channel with ID {BotState.status_channel_id} not found.")
-        return
+    def append(self, ts: float, row: dict):
+        self.ts[self.head] = ts
+        for name, column in self.columns.items():
+            column[self.head] = row[name]
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
 
-    try:
-        await channel.send(message)
-        logger.info(f"✅ Sent message to Discord: {message}")
-    except discord.Forbidden:
-        logger.error(f"🚫 Missing permissions to send messages in channel {channel.id}.")
-    except discord.HTTPException as e:
-        logger.error(f"❌ HTTP error sending message to Discord: {e}")
-    except Exception as e:
-        logger.error(f"❌ Unexpected error sending to Discord: {e}")
+    def latest(self) -> Optional[dict]:
+        if not self.count:
+            return None
+        i = (self.head - 1) % self.capacity
+        return {"ts": self.ts[i], **{name: column[i] for name, column in self.columns.items()}}
+
+    def window(self, since: float) -> dict[str, list[float]]:
+        """Column values for rows at or after `since`, oldest first."""
+        rows = {name: [] for name in self.columns}
+        start = (self.head - self.count) % self.capacity
+        for offset in range(self.count):
+            i = (start + offset) % self.capacity
+            if self.ts[i] >= since:
+                for name, column in self.columns.items():
+                    rows[name].append(column[i])
+        return rows
+
+class HostStatsCollector:
+    """
+    Samples the tracked server JVM (see ServerProcessWatcher) once a second
+    from a background thread: CPU% of the whole host, RSS, threads, open
+    file descriptors (handles on Windows), plus 1-minute load and available
+    host memory. The last hour is kept at 1 Hz and the last day as 1-minute
+    averages, both in fixed-size rings.
+    When CPU or RSS stays above `hoststats_cpu_alert` / `hoststats_rss_alert_mb`
+    for `hoststats_alert_window` seconds, the status channel is told once,
+    and again when it recovers.
+    """
 
-def extract_server_start_time_from_log(log_path):
-    try:
-        with open(log_path, "r", encoding="utf-8") as f:
-            for line in f:
-                if "Done (" in line and "For help, type" in line:
-                    match = re.search(r'\[(\d{2}[A-Za-z]{3}\d{4}) (\d{2}:\d{2}:\d{2})\.\d+\]', line)
-                    if match:
-                        date_str = match.group(1)
-                        time_str = match.group(2)
-                        full_str = f"{date_str} {time_str}"
-                        try:
-                            dt = datetime.strptime(full_str, "%d%b%Y %H:%M:%S")
-                            logger.info(f"🕰️ Extracted server start time: {dt} from {log_path}")
-                            return dt.timestamp()
-                        except ValueError as ve:
-                            logger.error(f"⛔ Date parse error in {log_path}: {ve}")
-    except Exception as e:
-        logger.error(f"❌ Error extracting server start time from {log_path}: {e}")
-    return None
+    def __init__(self):
+        self.hour = SeriesRing(HOST_STAT_COLUMNS, 3600)
+        self.day = SeriesRing(HOST_STAT_COLUMNS, 1440)
+        self.total_memory = psutil.virtual_memory().total
+        self._lock = threading.Lock()
+        self.pid: Optional[int] = None
+        self._minute: Optional[int] = None
+        self._minute_sums = dict.fromkeys(HOST_STAT_COLUMNS, 0.0)
+        self._minute_samples = 0
+        self._over_since = {"cpu": None, "rss": None}
+        self.alerting = {"cpu": False, "rss": False}
+        self.stats = {"samples": 0, "failures": 0, "alerts": 0}
+        self._started = False
+
+    def start(self):
+        if not self._started:
+            self._started = True
+            threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        logger.info("📈 Started host resource collector thread.")
+        while True:
+            started = time.monotonic()
+            try:
+                self.sample()
+            except Exception as e:
+                self.stats["failures"] += 1
+                logger.debug(f"📈 Host sample failed: {e}")
+            time.sleep(max(0.0, 1.0 - (time.monotonic() - started)))
+
+    def sample(self, now: Optional[float] = None):
+        proc = server_watcher.process
+        if proc is None:
+            return  # Nothing tracked yet (or the JVM just exited)
+
+        if proc.pid != self.pid:
+            self.pid = proc.pid
+            proc.cpu_percent(None)  # First call only sets the baseline
+            return
+
+        with proc.oneshot():
+            row = {
+                "cpu": proc.cpu_percent(None) / (psutil.cpu_count() or 1),
+                "rss": float(proc.memory_info().rss),
+                "threads": float(proc.num_threads()),
+                "fds": float(proc.num_fds() if hasattr(proc, "num_fds") else proc.num_handles()),
+            }
+        row["load"] = psutil.getloadavg()[0]
+        row["mem_available"] = float(psutil.virtual_memory().available)
+
+        now = now or time.time()
+        with self._lock:
+            self.hour.append(now, row)
+            minute = int(now // 60)
+            if self._minute is not None and minute != self._minute and self._minute_samples:
+                self.day.append(self._minute * 60, {
+                    name: total / self._minute_samples for name, total in self._minute_sums.items()
+                })
+                self._minute_sums = dict.fromkeys(HOST_STAT_COLUMNS, 0.0)
+                self._minute_samples = 0
+            self._minute = minute
+            for name, value in row.items():
+                self._minute_sums[name] += value
+            self._minute_samples += 1
+        self.stats["samples"] += 1
+        self._check_alerts(row, now)
+
+    def _check_alerts(self, row: dict, now: float):
+        limits = {
+            "cpu": CONFIG.get("hoststats_cpu_alert"),
+            "rss": (CONFIG.get("hoststats_rss_alert_mb") or 0) * 1024 * 1024 or None,
+        }
+        window = float(CONFIG.get("hoststats_alert_window", 120))
+        for name, limit in limits.items():
+            if not limit:
+                continue
+            if row[name] <= limit:
+                self._over_since[name] = None
+                if self.alerting[name]:
+                    self.alerting[name] = False
+                    relay_to_discord(f"✅ Server {self._describe(name, row)} is back under the alert threshold.")
+                continue
+
+            if self._over_since[name] is None:
+                self._over_since[name] = now
+            if not self.alerting[name] and now - self._over_since[name] >= window:
+                self.alerting[name] = True
+                self.stats["alerts"] += 1
+                logger.warning(f"🚨 Server {self._describe(name, row)} has been over the threshold for {window:.0f}s.")
+                relay_to_discord(
+                    f"🚨 Server {self._describe(name, row)} has been above the alert threshold for "
+                    f"{format_duration(window) if window >= 60 else f'{window:.0f}s'}."
+                )
 
-def start_log_poller():
-    log_path = Path("H:/Wanderlust Unbound Lite Server/logs/latest.log")
-    if not log_path.exists():
-        logger.error(f"❌ Could not find log file at: {log_path}")
-        return
+    @staticmethod
+    def _describe(name: str, row: dict) -> str:
+        if name == "cpu":
+            return f"CPU ({row['cpu']:.0f}%)"
+        return f"memory ({row['rss'] / 1024 ** 3:.2f} GB RSS)"
 
-    def poll():
-        logger.info(f"📂 Starting log poller on: {log_path}")
-        try:
-            with open(log_path, "r", encoding="utf-8", errors="replace") as file:
-                file.seek(0, os.SEEK_END)
-
-                while True:
-                    line = file.readline()
-                    if line:
-                        handle_log_line(line.strip())
-                    else:
-                        time.sleep(CONFIG.get("log_poll_interval", 1))
-        except Exception as e:
-            logger.exception(f"❌ Log poller encountered an error: {e}")
-            time.sleep(5)
+    def latest(self) -> Optional[dict]:
+        with self._lock:
+            return self.hour.latest()
 
-    threading.Thread(target=poll, daemon=True).start()
+    def window(self, tier: str, seconds: float) -> dict[str, list[float]]:
+        ring = self.hour if tier == "hour" else self.day
+        with self._lock:
+            return ring.window(time.time() - seconds)
 
-def strip_minecraft_formatting(text: str) -> str:
-    return re.sub(r'§[0-9a-fk-or]', '', text, flags=re.IGNORECASE)
+host_stats = HostStatsCollector()
 
 # ---------------------- Events ----------------------
 
@@ -1140,7 +4164,11 @@ async def on_ready():
     # Start all background tasks
     start_server_watcher()
     start_log_poller()
-    bot.loop.create_task(restart_bot_after_midnight_once())
+    player_snapshots.start()
+    claim_store.start()
+    reward_schedule.start()
+    perf_sampler.start()
+    host_stats.start()
     bot.loop.create_task(wait_for_server_ready())
 
 @bot.event
@@ -1155,9 +4183,8 @@ async def on_message(message):
     # Relay to Minecraft chat if message is in the status channel
     if BotState.status_channel_id and message.channel.id == BotState.status_channel_id:
         try:
-            text = f"{message.author.display_name}: {message.clean_content}"
-            send_to_minecraft_chat(text)
-            logger.info(f"💬 Relayed to Minecraft: {text}")
+            chat_relay.submit(message.author.display_name, message.clean_content)
+            logger.debug(f"💬 Queued for Minecraft: {message.author.display_name}: {message.clean_content}")
         except Exception as e:
             logger.error(f"❌ Failed to relay message to Minecraft: {e}")
 
@@ -1171,12 +4198,9 @@ async def mcstatus(interaction: discord.Interaction):
 
     server_ip = CONFIG.get("server_ip", "unknown")
     server_port = CONFIG.get("server_port", 25565)
-    rcon_port = CONFIG.get("rcon_port", 25575)
-    rcon_password = CONFIG.get("rcon_password", "")
 
     try:
-        server = JavaServer(server_ip, server_port)
-        status = server.status()
+        status = await ping_server(server_ip, server_port)
         latency = round(status.latency)
     except Exception as e:
         logger.warning(f"❌ Server ping failed: {e}")
@@ -1190,10 +4214,10 @@ async def mcstatus(interaction: discord.Interaction):
 
     # MOTD + Favicon
     try:
-        motd_raw = str(status.description)
+        motd_raw = status.motd
         motd = strip_minecraft_formatting(motd_raw).strip()
         icon_url = None
-        if hasattr(status, "favicon") and status.favicon.startswith("data:image/png;base64,"):
+        if status.favicon and status.favicon.startswith("data:image/png;base64,"):
             base64_data = status.favicon.split(",", 1)[1]
             icon_url = f"data:image/png;base64,{base64_data}"
     except Exception as e:
@@ -1201,48 +4225,46 @@ async def mcstatus(interaction: discord.Interaction):
         motd = "Welcome to the server!"
         icon_url = None
 
-    # Player list
+    # Player list (shared snapshot — no extra RCON round trip if it's fresh)
     try:
-        with MCRcon(server_ip, rcon_password, port=rcon_port) as m:
-            response = m.command("list")
-            match = re.search(r"There are (\d+) of a max of (\d+) players online(?:: (.*))?", response)
-            if match:
-                count = int(match.group(1))
-                max_players = int(match.group(2))
-                names_raw = match.group(3) or ""
-                name_list = [n.strip() for n in names_raw.split(",") if n.strip()]
-                max_display = 10
-                names_text = (
-                    ", ".join(name_list[:max_display]) + f", and {len(name_list) - max_display} more..."
-                    if len(name_list) > max_display else
-                    ", ".join(name_list) if name_list else "None"
-                )
+        snapshot = await player_snapshots.get()
+        if snapshot.count >= 0:
+            count = snapshot.count
+            max_players = snapshot.max_players
+            name_list = snapshot.names
+            max_display = 10
+            names_text = (
+                ", ".join(name_list[:max_display]) + f", and {len(name_list) - max_display} more..."
+                if len(name_list) > max_display else
+                ", ".join(name_list) if name_list else "None"
+            )
 
-                # Capacity bar
-                blocks = 10
-                fill_ratio = count / max_players if max_players > 0 else 0
-                filled_blocks = int(fill_ratio * blocks)
-                partial_block = "▰" if 0 < (fill_ratio * blocks - filled_blocks) < 1 else ""
-                empty_blocks = blocks - filled_blocks - (1 if partial_block else 0)
-
-                # Choose color emoji prefix (static emoji instead of filling every block)
-                if fill_ratio > 0.9:
-                    color_emoji = "🔴"
-                elif fill_ratio > 0.6:
-                    color_emoji = "🟠"
-                elif fill_ratio > 0.3:
-                    color_emoji = "🟡"
-                else:
-                    color_emoji = "🟢"
+            # Capacity bar
+            blocks = 10
+            fill_ratio = count / max_players if max_players > 0 else 0
+            filled_blocks = int(fill_ratio * blocks)
+            partial_block = "▰" if 0 < (fill_ratio * blocks - filled_blocks) < 1 else ""
+            empty_blocks = blocks - filled_blocks - (1 if partial_block else 0)
+
+            # Choose color emoji prefix (static emoji instead of filling every block)
+            if fill_ratio > 0.9:
+                color_emoji = "🔴"
+            elif fill_ratio > 0.6:
+                color_emoji = "🟠"
+            elif fill_ratio > 0.3:
+                color_emoji = "🟡"
+            else:
+                color_emoji = "🟢"
 
-                # Use consistent full/empty character blocks
-                bar = "█" * filled_blocks + partial_block + "░" * empty_blocks
-                capacity_bar = f"{color_emoji} `{bar}` `{count}/{max_players}`"
+            # Use consistent full/empty character blocks
+            bar = "█" * filled_blocks + partial_block + "░" * empty_blocks
+            capacity_bar = f"{color_emoji} `{bar}` `{count}/{max_players}`"
 
-            else:
-                count = 0
-                names_text = "None"
-                capacity_bar = "❓ Capacity data unavailable"
+        else:
+            count = 0
+            max_players = 0
+            names_text = "None"
+            capacity_bar = "❓ Capacity data unavailable"
     except Exception as e:
         logger.warning(f"⚠️ RCON failed: {e}")
         count = "?"
@@ -1327,7 +4349,7 @@ async def statushere(interaction: discord.Interaction):
     logger.info(f"📍 /statushere used by {interaction.user} in #{interaction.channel.name} ({interaction.channel.id})")
 
     BotState.status_channel_id = interaction.channel.id
-    save_config()
+    await persist_config()
 
     embed = discord.Embed(
         title="📍 Status Channel Set",
@@ -1481,7 +4503,7 @@ async def setserverconfig(
         response = f"⚠️ Config saved, but sync failed: `{e}`"
         logger.warning(f"⚠️ Slash command sync failed: {e}")
 
-    save_config()
+    await persist_config()
     await interaction.response.send_message(response, ephemeral=True)
 
 @bot.tree.command(name="daily", description="Claim your daily Minecraft login reward!")
@@ -1494,20 +4516,71 @@ async def daily(interaction: discord.Interaction):
         await interaction.followup.send("❌ Please use this command in the Minecraft status channel.", ephemeral=True)
         return
 
-    username = get_linked_username(interaction.user.id)
+    username = await get_linked_username(interaction.user.id)
     if not username:
         await interaction.followup.send("❌ You haven't linked your Minecraft username yet. Use `/linkmc`.", ephemeral=True)
         return
 
-    can_claim, streak, now, last_claim = get_streak_info(username)
-    logger.info(f"🧾 Claim check — Can Claim: {can_claim}, Streak: {streak}, Last Claim: {last_claim}")
-
     tz_name = CONFIG.get("timezone", "UTC")
     tz = ZoneInfo(tz_name)
-    now_local = now.astimezone(tz)
+    now_local = datetime.now(timezone.utc).astimezone(tz)
     formatted_reset_time = now_local.replace(hour=6, minute=0, second=0, microsecond=0).strftime('%I:%M %p %Z')
 
-    if not can_claim:
+    rewards = await load_daily_data()
+    delivered = {}
+    status_message = None
+
+    async def reply(content: Optional[str] = None, embed: Optional[discord.Embed] = None):
+        """First reply is an ephemeral followup; later ones edit it in place."""
+        nonlocal status_message
+        if status_message is None:
+            kwargs = {"embed": embed} if embed else {}
+            status_message = await interaction.followup.send(content, ephemeral=True, wait=True, **kwargs)
+        else:
+            await status_message.edit(content=content, embed=embed)
+
+    async def deliver(streak: int):
+        reward_day = min(streak, 7)
+        reward = rewards.get(reward_day)
+        if not reward:
+            logger.error(f"⚠️ No reward configured for Day {reward_day}")
+            raise RewardNotDelivered("⚠️ No reward configured for this day.")
+
+        position, done = claim_deliveries.submit(username, reward, formatted_reset_time)
+        try:
+            await reply(f"⏳ Your reward is queued — position **{position}**. This message will update once it's delivered.")
+        except discord.HTTPException as e:
+            logger.warning(f"⚠️ Couldn't send queue position to {interaction.user}: {e}")
+        await done
+        delivered["reward"] = reward
+
+    try:
+        attempt = await claim_daily_reward(username, deliver)
+    except RewardNotDelivered as e:
+        await reply(str(e))
+        return
+    except RewardDeliveryUncertain as e:
+        await reply(
+            f"⚠️ We couldn't confirm your reward was delivered (`{e}`).\n"
+            "Check your inventory — if it's missing, please contact an admin. Today's claim has been used."
+        )
+        return
+    except Exception as e:
+        logger.exception(f"❌ Failed to issue reward for {username}: {e}")
+        await reply(f"❌ Failed to issue reward: `{e}`")
+        return
+
+    streak, last_claim = attempt.streak, attempt.last_claim
+    logger.info(f"🧾 Claim attempt — Status: {attempt.status}, Streak: {streak}, Last Claim: {last_claim}")
+
+    if attempt.status == "pending":
+        await reply(
+            f"⏳ Today's reward for **{username}** has already been handed out or is on its way.\n"
+            f"⏰ Daily resets at **{formatted_reset_time}**."
+        )
+        return
+
+    if attempt.status == "claimed":
         last_local = last_claim.astimezone(tz) if last_claim else None
         next_reset = now_local.replace(hour=6, minute=0, second=0, microsecond=0)
         if now_local >= next_reset:
@@ -1522,21 +4595,12 @@ async def daily(interaction: discord.Interaction):
             f"⏰ Daily resets at **{formatted_reset_time}**."
         ) if last_local else f"🕒 You've already claimed your reward recently.\n⏰ Daily resets at **{formatted_reset_time}**."
 
-        await interaction.followup.send(msg, ephemeral=True)
+        await reply(msg)
         return
 
-    rewards = load_daily_data()
-    reward_day = min(streak, 7)
-    reward = rewards.get(str(reward_day))
-
-    if not reward:
-        logger.error(f"⚠️ No reward configured for Day {reward_day}")
-        await interaction.followup.send("⚠️ No reward configured for this day.", ephemeral=True)
-        return
-
-    item_id = reward["item"]
-    amount = reward["amount"]
-    sound = STREAK_SOUNDS.get(reward_day, "minecraft:entity.player.levelup")
+    reward = delivered["reward"]
+    item_id = reward.item
+    amount = reward.amount
 
     # Optional: Build a simple streak progress bar
     streak_visual = "".join("🟩" if i < min(streak, 7) else "⬜" for i in range(7))
@@ -1561,60 +4625,16 @@ async def daily(interaction: discord.Interaction):
 
     # Show next reward preview if applicable
     next_day = (streak % 7) + 1
-    next_reward = rewards.get(str(next_day))
+    next_reward = rewards.get(next_day)
     if next_reward:
-        next_item = next_reward["item"].split(":")[-1].replace("_", " ").title()
         embed.set_footer(
-            text=f"🎁 Tomorrow: {next_reward['amount']}x {next_item} • Resets at {formatted_reset_time}"
+            text=f"🎁 Tomorrow: {next_reward.amount}x {next_reward.display_name} • Resets at {formatted_reset_time}"
         )
     else:
         embed.set_footer(text=f"⏰ Daily resets at {formatted_reset_time}")
 
-    try:
-        with MCRcon(CONFIG["server_ip"], CONFIG["rcon_password"], port=CONFIG["rcon_port"]) as m:
-            logger.info("🔌 RCON connected")
-
-            rcon_output = m.command("list")
-            rcon_players = parse_rcon_list_output(rcon_output)["names"]
-            logger.debug(f"🧍 Online players: {rcon_players}")
-
-            if username.lower() not in [n.lower() for n in rcon_players]:
-                await interaction.followup.send(
-                    f"❌ You are not online in Minecraft as **{username}**.\nPlease join the server first.",
-                    ephemeral=True
-                )
-                return
-
-            m.command("gamerule sendCommandFeedback false")
-            m.command(f"execute as {username} run give {username} {item_id} {amount}")
-            m.command(f"execute as {username} at {username} run playsound {sound} player {username} ~ ~ ~ 1 1")
-
-            for cmd in get_fancy_particle_commands(username):
-                m.command(cmd)
-
-            message_json = json.dumps([
-                {"text": "🎁 ", "color": "gold"},
-                {"text": f"{username}", "color": "yellow"},
-                {"text": " has claimed their daily reward: ", "color": "gold"},
-                {"text": f"{amount}x {item_id.replace('numismatic-overhaul:', '')}", "color": "aqua"},
-                {"text": "\nType ", "color": "gray"},
-                {"text": "/daily", "color": "blue"},
-                {"text": " in Discord to get yours.", "color": "gray"},
-                {"text": "\n(Link your account with ", "color": "dark_gray"},
-                {"text": "/linkmc <username>", "color": "blue"},
-                {"text": ")", "color": "dark_gray"},
-                {"text": f"\n⏰ Daily resets at {formatted_reset_time}", "color": "gray"}
-            ])
-            m.command(f'tellraw @a {message_json}')
-            m.command("gamerule sendCommandFeedback true")
-
-        logger.info(f"🎉 {username} claimed Day {streak} reward: {amount}x {item_id}")
-        await interaction.followup.send(embed=embed, ephemeral=True)
-        update_streak_info(username, now, streak)
-
-    except Exception as e:
-        logger.exception(f"❌ Failed to issue reward for {username}: {e}")
-        await interaction.followup.send(f"❌ Failed to issue reward: `{e}`", ephemeral=True)
+    logger.info(f"🎉 {username} claimed Day {streak} reward: {amount}x {item_id}")
+    await reply(embed=embed)
 
 
 # /linkmc
@@ -1624,25 +4644,21 @@ async def linkmc(interaction: discord.Interaction, username: str):
     await interaction.response.defer(ephemeral=True)
     logger.info(f"🔗 /linkmc triggered by {interaction.user} ({interaction.user.id}) → {username}")
 
-    filepath = "data/linked_users.json"
-    os.makedirs("data", exist_ok=True)
-
-    # Load or initialize file
-    if not os.path.exists(filepath):
-        with open(filepath, "w") as f:
-            json.dump({}, f)
-
-    with open(filepath, "r", encoding="utf-8") as f:
-        linked_users = json.load(f)
-
-    discord_id_str = str(interaction.user.id)
     username = username.strip().lower()
-    prev = linked_users.get(discord_id_str)
+    prev = await get_linked_username(interaction.user.id)
 
     # Update and save
-    linked_users[discord_id_str] = username
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(linked_users, f, indent=2, ensure_ascii=False)
+    if prev != username:
+        try:
+            await set_linked_username(interaction.user.id, username)
+        except LinkConflictError as e:
+            logger.warning(f"⛔ /linkmc conflict: {interaction.user} tried to link '{username}' owned by {e.owner_id}")
+            await interaction.followup.send(
+                f"❌ **{username}** is already linked to another Discord account.\n"
+                f"If that name is yours, please contact an admin.",
+                ephemeral=True
+            )
+            return
 
     # Feedback
     if prev and prev != username:
@@ -1662,7 +4678,7 @@ async def rewards(interaction: discord.Interaction):
     await interaction.response.defer(ephemeral=True)
 
     try:
-        rewards_data = load_daily_data()
+        rewards_data = await load_daily_data()
     except Exception as e:
         logger.exception(f"❌ Failed to load daily rewards: {e}")
         await interaction.followup.send("❌ Failed to load reward data. Please try again later.", ephemeral=True)
@@ -1682,13 +4698,11 @@ async def rewards(interaction: discord.Interaction):
     )
 
     for day in range(1, 8):
-        reward = rewards_data.get(str(day))
+        reward = rewards_data.get(day)
         if reward:
-            item = reward["item"].replace("numismatic-overhaul:", "")
-            amount = reward["amount"]
             embed.add_field(
                 name=f"Day {day}",
-                value=f"• **{amount}x** `{item}`",
+                value=f"• **{reward.amount}x** `{reward.short_item}`",
                 inline=True
             )
         else:
@@ -1712,6 +4726,331 @@ async def rewards(interaction: discord.Interaction):
 
     await interaction.followup.send(embed=embed, ephemeral=True)
 
+# /playtime
+@bot.tree.command(name="playtime", description="Show how long a player has spent on the Minecraft server")
+@app_commands.describe(username="(Optional) Minecraft username — defaults to your linked account")
+async def playtime(interaction: discord.Interaction, username: Optional[str] = None):
+    logger.info(f"⏱️ /playtime used by {interaction.user} ({interaction.user.id}) → {username}")
+
+    username = (username or await get_linked_username(interaction.user.id) or "").strip()
+    if not username:
+        await interaction.response.send_message(
+            "❌ Give a username or link yours first with `/linkmc`.", ephemeral=True
+        )
+        return
+
+    total, sessions, online = session_tracker.playtime(username)
+    if total <= 0 and not online:
+        await interaction.response.send_message(f"📭 No playtime recorded for **{username}** yet.", ephemeral=True)
+        return
+
+    rank = session_tracker.rank(username)
+    embed = discord.Embed(
+        title=f"⏱️ Playtime — {username}",
+        description=f"**{format_duration(total)}** in the world",
+        color=discord.Color.green() if online else discord.Color.blurple()
+    )
+    embed.add_field(name="🎮 Sessions", value=str(sessions + (1 if online else 0)), inline=True)
+    embed.add_field(name="🏆 Rank", value=f"#{rank}" if rank else "—", inline=True)
+    embed.add_field(name="🟢 Status", value="Online now" if online else "Offline", inline=True)
+    await interaction.response.send_message(embed=embed)
+
+# /leaderboard
+@bot.tree.command(name="leaderboard", description="Top players by total playtime or by daily claims this week")
+@app_commands.describe(board="Which leaderboard to show (defaults to playtime)")
+@app_commands.choices(board=[
+    app_commands.Choice(name="playtime", value="playtime"),
+    app_commands.Choice(name="weekly", value="weekly"),
+])
+async def leaderboard(interaction: discord.Interaction, board: Optional[app_commands.Choice[str]] = None):
+    logger.info(f"🏆 /leaderboard used by {interaction.user} ({interaction.user.id}) → {board.value if board else 'playtime'}")
+
+    if board and board.value == "weekly":
+        await weekly_leaderboard(interaction)
+        return
+
+    rows = session_tracker.leaderboard(10)
+    if not rows:
+        await interaction.response.send_message("📭 No playtime has been recorded yet.", ephemeral=True)
+        return
+
+    medals = ["🥇", "🥈", "🥉"]
+    lines = [
+        f"{medals[i] if i < len(medals) else f'`#{i + 1}`'} **{name}** — {format_duration(total)}{' 🟢' if online else ''}"
+        for i, (name, total, online) in enumerate(rows)
+    ]
+    embed = discord.Embed(
+        title="🏆 Playtime Leaderboard",
+        description="\n".join(lines),
+        color=discord.Color.gold()
+    )
+    embed.set_footer(text=f"Tracking {session_tracker.player_count()} player(s) • 🟢 = online now")
+    await interaction.response.send_message(embed=embed)
+
+async def weekly_leaderboard(interaction: discord.Interaction):
+    week = claim_week(datetime.now(timezone.utc))
+    try:
+        rows = await claim_store.weekly_top(week, 10)
+    except sqlite3.Error as e:
+        logger.error(f"❌ Failed to load weekly claims for {week}: {e}")
+        await interaction.response.send_message("❌ Couldn't load this week's claims. Try again later.", ephemeral=True)
+        return
+
+    if not rows:
+        await interaction.response.send_message("📭 Nobody has claimed a daily reward this week yet.", ephemeral=True)
+        return
+
+    medals = ["🥇", "🥈", "🥉"]
+    lines = [
+        f"{medals[i] if i < len(medals) else f'`#{i + 1}`'} **{name}** — {claims} claim{'s' if claims != 1 else ''} "
+        f"• best streak {best_streak}🔥"
+        for i, (name, claims, best_streak) in enumerate(rows)
+    ]
+    embed = discord.Embed(
+        title=f"📅 Weekly Claim Leaderboard ({week})",
+        description="\n".join(lines),
+        color=discord.Color.gold()
+    )
+    embed.set_footer(text="Weeks run Monday to Monday at the daily reset time")
+    await interaction.response.send_message(embed=embed)
+
+# /perf
+@bot.tree.command(name="perf", description="Show server TPS and tick times per dimension")
+@app_commands.describe(minutes="How far back to summarise (default 10)")
+async def perf(interaction: discord.Interaction, minutes: Optional[app_commands.Range[int, 1, 1440]] = 10):
+    logger.info(f"📊 /perf used by {interaction.user} ({interaction.user.id}) → {minutes}m")
+
+    dims = perf_sampler.dimensions()
+    if not dims:
+        await interaction.response.send_message(
+            "📭 No tick samples yet — the server may be offline or not support `forge tps` / `tick query`.",
+            ephemeral=True
+        )
+        return
+
+    window = minutes * 60
+    embed = discord.Embed(
+        title="📊 Server Performance",
+        description=f"Last **{minutes}** minute(s), sampled every {CONFIG.get('perf_sample_interval', 10)}s "
+                    f"with `{perf_sampler.command or CONFIG.get('perf_command') or '?'}`",
+        color=discord.Color.green()
+    )
+
+    worst_tps = 20.0
+    for dim in dims[:10]:  # Keep the embed well inside Discord's field limit
+        summary = perf_sampler.summary(dim, window)
+        if summary is None:
+            continue
+        worst_tps = min(worst_tps, summary["tps_min"])
+        embed.add_field(
+            name=f"🌍 {dim.removeprefix('minecraft:').replace('_', ' ').title()}",
+            value=(
+                f"• Now: **{summary['tps']:.1f} TPS**, **{summary['mspt']:.1f} ms/tick** ({summary['age']:.0f}s ago)\n"
+                f"• TPS: min **{summary['tps_min']:.1f}**, avg **{summary['tps_avg']:.1f}**, p95 **{summary['tps_p95']:.1f}**\n"
+                f"• MSPT: avg **{summary['mspt_avg']:.1f}**, p95 **{summary['mspt_p95']:.1f}**, max **{summary['mspt_max']:.1f}**\n"
+                f"`{summary['sparkline']}` ({summary['samples']} samples)"
+            ),
+            inline=False
+        )
+
+    if worst_tps < 15:
+        embed.color = discord.Color.red()
+    elif worst_tps < 19:
+        embed.color = discord.Color.orange()
+    embed.set_footer(text="TPS p95 is the slow end: 95% of samples ran at least that fast • sparkline shows each bucket's lowest TPS")
+    await interaction.response.send_message(embed=embed)
+
+# /hoststats
+@bot.tree.command(name="hoststats", description="Show the Minecraft server process's CPU, memory and host load")
+@app_commands.describe(period="Summarise the last hour (1s samples) or the last day (1-minute averages)")
+@app_commands.choices(period=[
+    app_commands.Choice(name="hour", value="hour"),
+    app_commands.Choice(name="day", value="day"),
+])
+async def hoststats(interaction: discord.Interaction, period: Optional[app_commands.Choice[str]] = None):
+    tier = period.value if period else "hour"
+    logger.info(f"🖥️ /hoststats used by {interaction.user} ({interaction.user.id}) → {tier}")
+
+    latest = host_stats.latest()
+    if latest is None:
+        await interaction.response.send_message(
+            "📭 No samples yet — the server process hasn't been found.", ephemeral=True
+        )
+        return
+
+    rows = host_stats.window(tier, 3600 if tier == "hour" else 86400)
+    if not rows["cpu"]:
+        rows = {name: [latest[name]] for name in HOST_STAT_COLUMNS}
+
+    gb = 1024 ** 3
+    total_gb = host_stats.total_memory / gb
+    cpu, rss = rows["cpu"], [value / gb for value in rows["rss"]]
+
+    embed = discord.Embed(
+        title="🖥️ Server Host Stats",
+        description=f"PID **{host_stats.pid}** • last {tier} ({len(cpu)} samples)",
+        color=discord.Color.dark_teal()
+    )
+    embed.add_field(
+        name="⚙️ CPU (% of host)",
+        value=(
+            f"• Now **{latest['cpu']:.0f}%**, avg **{sum(cpu) / len(cpu):.0f}%**, "
+            f"p95 **{percentile(cpu, 95):.0f}%**, max **{max(cpu):.0f}%**\n"
+            f"`{sparkline(cpu, low=0.0, high=100.0)}`"
+        ),
+        inline=False
+    )
+    embed.add_field(
+        name="🧠 Memory (RSS)",
+        value=(
+            f"• Now **{latest['rss'] / gb:.2f} GB** of {total_gb:.1f} GB, avg **{sum(rss) / len(rss):.2f} GB**, "
+            f"max **{max(rss):.2f} GB**\n"
+            f"• Host memory available: **{latest['mem_available'] / gb:.2f} GB**\n"
+            f"`{sparkline(rss, low=0.0, high=max(max(rss), 0.001))}`"
+        ),
+        inline=False
+    )
+    embed.add_field(
+        name="🧵 Process",
+        value=(
+            f"• Threads: **{latest['threads']:.0f}** (max {max(rows['threads']):.0f})\n"
+            f"• Open files/handles: **{latest['fds']:.0f}** (max {max(rows['fds']):.0f})\n"
+            f"• Host load (1m): **{latest['load']:.2f}** (max {max(rows['load']):.2f})"
+        ),
+        inline=False
+    )
+
+    alerts = [name.upper() for name, active in host_stats.alerting.items() if active]
+    if alerts:
+        embed.color = discord.Color.red()
+        embed.set_footer(text=f"🚨 Over threshold: {', '.join(alerts)}")
+    await interaction.response.send_message(embed=embed)
+
+# /botmetrics
+@bot.tree.command(name="botmetrics", description="Show Wanderbot's internal performance metrics")
+async def botmetrics(interaction: discord.Interaction):
+    logger.info(f"📈 /botmetrics used by {interaction.user} ({interaction.user.id})")
+    await interaction.response.defer(ephemeral=True)
+
+    embed = discord.Embed(
+        title="📈 Wanderbot Metrics",
+        color=discord.Color.teal()
+    )
+
+    rcon = rcon_pool.metrics()
+    embed.add_field(
+        name="🔌 RCON Pool",
+        value=(
+            f"• Sessions: **{rcon['open_sessions']}** open, **{rcon['in_flight']}** in flight\n"
+            f"• Connects: **{rcon['connects']}** (failed: {rcon['connect_failures']})\n"
+            f"• Commands: **{rcon['commands']}** in **{rcon['batches']}** batches "
+            f"(errors: {rcon['errors']}, failed: {rcon['command_failures']}, retries: {rcon['retries']})\n"
+            f"• Reuse ratio: **{rcon['reuse_ratio']:.0%}**\n"
+            f"• Wait: avg **{rcon['wait_avg'] * 1000:.1f}ms**, max **{rcon['wait_max'] * 1000:.1f}ms**"
+        ),
+        inline=False
+    )
+
+    players = player_snapshots.metrics()
+    age_text = f"{players['age']:.1f}s" if players["age"] is not None else "n/a"
+    embed.add_field(
+        name="👥 Player Snapshot",
+        value=(
+            f"• Age: **{age_text}** (TTL {CONFIG.get('player_snapshot_ttl', 10)}s)\n"
+            f"• Cache hits: **{players['hits']}**, refreshes: **{players['refreshes']}** "
+            f"(coalesced: {players['coalesced']}, failed: {players['failures']})"
+        ),
+        inline=False
+    )
+
+    relay = chat_relay.metrics()
+    embed.add_field(
+        name="💬 Chat Relay (Discord → MC)",
+        value=(
+            f"• Queue depth: **{relay['depth']}** (peak {relay['peak_depth']})\n"
+            f"• Relayed: **{relay['relayed']}** in **{relay['batches']}** batches "
+            f"(merged: {relay['merged']}, dropped: {relay['dropped']}, failed: {relay['failed']})\n"
+            f"• Latency: p50 **{relay['latency_p50'] * 1000:.0f}ms**, p95 **{relay['latency_p95'] * 1000:.0f}ms**, "
+            f"max **{relay['latency_max'] * 1000:.0f}ms**"
+        ),
+        inline=False
+    )
+
+    links = link_registry.metrics()
+    embed.add_field(
+        name="🔗 Linked Accounts",
+        value=(
+            f"• Cached: **{links['size']}** account(s), hit rate **{links['hit_rate']:.0%}**\n"
+            f"• Hits: **{links['hits']}**, misses: **{links['misses']}** "
+            f"(reloads: {links['reloads']}, writes: {links['writes']})"
+        ),
+        inline=False
+    )
+
+    claims = claim_store.metrics()
+    embed.add_field(
+        name="📒 Claims",
+        value=(
+            f"• Committed: **{claims['claims']}** in **{claims['batches']}** batches "
+            f"(max batch {claims['max_batch']}, pending {claims['pending']}, failed {claims['failures']})\n"
+            f"• Commit: p50 **{claims['commit_p50'] * 1000:.1f}ms**, p95 **{claims['commit_p95'] * 1000:.1f}ms** "
+            f"• WAL checkpoints: {claims['checkpoints']}\n"
+            f"• Grants: reserved **{claims['reserved']}**, released {claims['released']}, "
+            f"duplicates blocked {claims['duplicates']}"
+        ),
+        inline=False
+    )
+
+    deliveries = claim_deliveries.metrics()
+    embed.add_field(
+        name="🎁 Reward Delivery",
+        value=(
+            f"• Queue depth: **{deliveries['depth']}** (peak {deliveries['peak_depth']}, rejected {deliveries['rejected']})\n"
+            f"• Delivered: **{deliveries['delivered']}** in **{deliveries['batches']}** batches "
+            f"(max batch {deliveries['max_batch']}, offline {deliveries['offline']}, failed {deliveries['failed']})\n"
+            f"• Queue wait: p50 **{deliveries['wait_p50'] * 1000:.0f}ms**, p95 **{deliveries['wait_p95'] * 1000:.0f}ms**, "
+            f"p99 **{deliveries['wait_p99'] * 1000:.0f}ms**\n"
+            f"• Delivery: p50 **{deliveries['delivery_p50'] * 1000:.0f}ms**, p95 **{deliveries['delivery_p95'] * 1000:.0f}ms**, "
+            f"p99 **{deliveries['delivery_p99'] * 1000:.0f}ms**"
+        ),
+        inline=False
+    )
+
+    health = server_health.metrics()
+
+    def last_probe(latency):
+        return "failed" if latency is None else f"{latency * 1000:.0f}ms"
+
+    embed.add_field(
+        name="🩺 Server Health",
+        value=(
+            f"• State: **{'degraded' if health['degraded'] else 'healthy'}**, "
+            f"failed ticks in a row: **{health['consecutive_failures']}**\n"
+            f"• Ping: last {last_probe(health['ping_last'])}, p50 **{health['ping_p50'] * 1000:.0f}ms**, "
+            f"p95 **{health['ping_p95'] * 1000:.0f}ms** (failures: {health['ping_failures']})\n"
+            f"• RCON: last {last_probe(health['rcon_last'])}, p50 **{health['rcon_p50'] * 1000:.0f}ms**, "
+            f"p95 **{health['rcon_p95'] * 1000:.0f}ms** (failures: {health['rcon_failures']})\n"
+            f"• Ticks: {health['ticks']} (degraded: {health['degraded_ticks']}, failed: {health['failed_ticks']})"
+        ),
+        inline=False
+    )
+
+    outbox = discord_outbox.metrics()
+    embed.add_field(
+        name="📤 Event Relay (MC → Discord)",
+        value=(
+            f"• Queue depth: **{outbox['depth']}** (peak {outbox['peak_depth']})\n"
+            f"• Sent: **{outbox['events_sent']}** events in **{outbox['messages_sent']}** messages "
+            f"(rate limited: {outbox['rate_limited']}, dropped: {outbox['dropped']}, failed: {outbox['failed']})\n"
+            f"• Throughput (last {int(DiscordOutbox.RATE_WINDOW)}s): **{outbox['events_per_sec']:.2f}** events/s, "
+            f"**{outbox['messages_per_sec']:.2f}** messages/s\n"
+            f"• Latency: p50 **{outbox['latency_p50'] * 1000:.0f}ms**, p95 **{outbox['latency_p95'] * 1000:.0f}ms**"
+        ),
+        inline=False
+    )
+
+    await interaction.followup.send(embed=embed, ephemeral=True)
+
 # /helpme
 @bot.tree.command(name="helpme", description="List all Wanderbot commands")
 async def helpme(interaction: discord.Interaction):
@@ -1731,6 +5070,10 @@ async def helpme(interaction: discord.Interaction):
             "• **`/linkmc <username>`** — Link your Minecraft username to your Discord.\n"
             "• **`/daily`** — Claim your daily reward *(must be online in Minecraft)*.\n"
             "• **`/rewards`** — View the 7-day daily reward schedule.\n"
+            "• **`/playtime [username]`** — See total time played on the server.\n"
+            "• **`/leaderboard [weekly]`** — Top players by playtime, or by daily claims this week.\n"
+            "• **`/perf [minutes]`** — Server TPS and tick times per dimension.\n"
+            "• **`/hoststats [hour|day]`** — Server process CPU, memory and host load.\n"
             "• **`/howtojoin`** — Get instructions on how to join the Minecraft server."
         ),
         inline=False
@@ -1751,7 +5094,8 @@ async def helpme(interaction: discord.Interaction):
         name="🛠️ Admin Commands",
         value=(
             "• **`/setserverconfig`** — Configure IP, port, RCON, timezone, and guild ID.\n"
-            "• **`/statushere`** — Set this channel to receive status updates."
+            "• **`/statushere`** — Set this channel to receive status updates.\n"
+            "• **`/botmetrics`** — Show internal performance metrics."
         ),
         inline=False
     )
@@ -1774,4 +5118,11 @@ async def main():
         await bot.start(TOKEN)
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # python bot.py --bench-logs <latest.log> [more.log.gz ...]
+    if len(sys.argv) > 2 and sys.argv[1] == "--bench-logs":
+        benchmark_log_classifier(sys.argv[2:])
+    # python bot.py --bench-claims [claims] [players] [p99 bound in ms]
+    elif len(sys.argv) > 1 and sys.argv[1] == "--bench-claims":
+        asyncio.run(benchmark_daily_claims(*map(int, sys.argv[2:5])))
+    else:
+        asyncio.run(main())
@@ -0,0 +1,286 @@
+"""
+Columnar store of historical server log events.
+
+Archived logs (`logs/*.log.gz`) are decompressed and classified in parallel
+on a process pool, using the same rules as the live relay (log_events.py).
+Each archive becomes one segment directory of fixed-width column files that
+are memory-mapped for queries. A manifest records which archives were
+ingested, so re-running only processes new or changed files.
+
+    python event_store.py "H:/Wanderlust Unbound Lite Server/logs"
+"""
+
+import gzip
+import json
+import logging
+import mmap
+import os
+import re
+import shutil
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+from pathlib import Path
+from typing import Optional
+
+from log_events import LogClassifier, LOG_EVENT_RULES, parse_log_timestamp
+
+logger = logging.getLogger()
+
+EVENT_STORE_DIR = os.path.join("data", "events")
+MANIFEST_FILE = "manifest.json"
+NO_STRING = 0xFFFFFFFF
+
+EVENT_KINDS = [rule.name for rule in LOG_EVENT_RULES]
+
+# name -> array typecode; one file per column, all the same length
+COLUMNS = {
+    "ts": "d",      # epoch seconds
+    "kind": "B",    # index into EVENT_KINDS
+    "player": "I",  # index into the segment's string table (NO_STRING if none)
+    "detail": "I",  # chat message / advancement / death message
+}
+
+ARCHIVE_DATE_PATTERN = re.compile(r"(\d{4})-(\d{2})-(\d{2})")
+
+def archive_date(path: Path) -> Optional[date]:
+    """Vanilla archives are named `2025-06-27-1.log.gz`; their lines carry no date."""
+    match = ARCHIVE_DATE_PATTERN.match(path.name)
+    if not match:
+        return None
+    try:
+        return date(*map(int, match.groups()))
+    except ValueError:
+        return None
+
+def ingest_archive(path: str, segment_dir: str) -> dict:
+    """Worker: parse one archive and write its segment. Returns size and event counts."""
+    path = Path(path)
+    classifier = LogClassifier(LOG_EVENT_RULES)
+    kind_codes = {kind: code for code, kind in enumerate(EVENT_KINDS)}
+    day = archive_date(path)
+
+    columns = {name: array(typecode) for name, typecode in COLUMNS.items()}
+    strings = []
+    string_ids = {}
+
+    def intern(value: Optional[str]) -> int:
+        if value is None:
+            return NO_STRING
+        if value not in string_ids:
+            string_ids[value] = len(strings)
+            strings.append(value)
+        return string_ids[value]
+
+    raw_bytes = 0
+    open_func = gzip.open if path.suffix == ".gz" else open
+    with open_func(path, "rb") as f:
+        for raw in f:
+            raw_bytes += len(raw)
+            event = classifier.classify(raw.decode("utf-8", errors="replace").strip())
+            if event is None:
+                continue
+            ts = parse_log_timestamp(event.timestamp, day)
+            detail = event.fields.get("message") or event.fields.get("advancement")
+            if event.kind == "death":
+                detail = event.body
+            columns["ts"].append(ts if ts is not None else float("nan"))
+            columns["kind"].append(kind_codes[event.kind])
+            columns["player"].append(intern(event.fields.get("player")))
+            columns["detail"].append(intern(detail))
+
+    os.makedirs(segment_dir, exist_ok=True)
+    for name, values in columns.items():
+        with open(os.path.join(segment_dir, f"{name}.col"), "wb") as f:
+            values.tofile(f)
+    with open(os.path.join(segment_dir, "strings.json"), "w", encoding="utf-8") as f:
+        json.dump(strings, f, ensure_ascii=False)
+
+    return {
+        "compressed_bytes": path.stat().st_size,
+        "raw_bytes": raw_bytes,
+        "lines": classifier.stats["lines"],
+        "events": len(columns["ts"]),
+    }
+
+class Segment:
+    """One archive's events, memory-mapped column by column."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._maps = []
+        self.columns = {name: self._map(name, typecode) for name, typecode in COLUMNS.items()}
+        with open(os.path.join(directory, "strings.json"), "r", encoding="utf-8") as f:
+            self.strings = json.load(f)
+
+    def _map(self, name: str, typecode: str):
+        path = os.path.join(self.directory, f"{name}.col")
+        if os.path.getsize(path) == 0:
+            return array(typecode)  # mmap refuses empty files
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mapped)
+        return memoryview(mapped).cast(typecode)
+
+    def __len__(self) -> int:
+        return len(self.columns["ts"])
+
+    def string(self, index: int) -> Optional[str]:
+        return None if index == NO_STRING else self.strings[index]
+
+    def close(self):
+        for column in self.columns.values():
+            if isinstance(column, memoryview):
+                column.release()
+        for mapped in self._maps:
+            mapped.close()
+
+class EventStore:
+    def __init__(self, directory: str = EVENT_STORE_DIR):
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, MANIFEST_FILE)
+        self.manifest = self._load_manifest()
+        self._segments = {}
+
+    def _load_manifest(self) -> dict:
+        if not os.path.exists(self.manifest_path):
+            return {"archives": {}}
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"⚠️ Event store manifest unreadable, re-ingesting everything: {e}")
+            return {"archives": {}}
+
+    def _save_manifest(self):
+        os.makedirs(self.directory, exist_ok=True)
+        temp_path = self.manifest_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(temp_path, self.manifest_path)
+
+    def pending_archives(self, log_dir: Path) -> list[Path]:
+        """Archives that are new or changed since they were last ingested."""
+        pending = []
+        for path in sorted(log_dir.glob("*.log.gz")):
+            st = path.stat()
+            entry = self.manifest["archives"].get(path.name)
+            if not entry or entry["size"] != st.st_size or entry["mtime"] != st.st_mtime:
+                pending.append(path)
+        return pending
+
+    def ingest(self, log_dir: Path, workers: Optional[int] = None) -> dict:
+        """Ingest every pending archive in parallel; returns throughput totals."""
+        pending = self.pending_archives(log_dir)
+        totals = {"archives": 0, "compressed_bytes": 0, "raw_bytes": 0, "lines": 0, "events": 0, "seconds": 0.0}
+        if not pending:
+            logger.info("📚 Event store is up to date.")
+            return totals
+
+        logger.info(f"📚 Ingesting {len(pending)} archive(s) from {log_dir}...")
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {}
+            for path in pending:
+                segment_name = path.name.removesuffix(".log.gz")
+                temp_dir = os.path.join(self.directory, segment_name + ".tmp")
+                shutil.rmtree(temp_dir, ignore_errors=True)
+                futures[pool.submit(ingest_archive, str(path), temp_dir)] = (path, segment_name, temp_dir)
+
+            for future in as_completed(futures):
+                path, segment_name, temp_dir = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"❌ Failed to ingest {path.name}: {e}")
+                    shutil.rmtree(temp_dir, ignore_errors=True)
+                    continue
+
+                segment_dir = os.path.join(self.directory, segment_name)
+                self._drop_segment(segment_name)
+                shutil.rmtree(segment_dir, ignore_errors=True)
+                os.replace(temp_dir, segment_dir)
+
+                st = path.stat()
+                self.manifest["archives"][path.name] = {
+                    "size": st.st_size,
+                    "mtime": st.st_mtime,
+                    "segment": segment_name,
+                    "events": result["events"],
+                }
+                # Saved per archive so an interrupted run keeps what it finished
+                self._save_manifest()
+
+                totals["archives"] += 1
+                for key in ("compressed_bytes", "raw_bytes", "lines", "events"):
+                    totals[key] += result[key]
+
+        totals["seconds"] = time.perf_counter() - started
+        seconds = totals["seconds"] or float("inf")
+        logger.info(
+            f"✅ Ingested {totals['archives']} archive(s): {totals['events']} events from {totals['lines']} lines "
+            f"in {totals['seconds']:.2f}s — {totals['compressed_bytes'] / seconds / 1e6:.1f} MB/s compressed, "
+            f"{totals['raw_bytes'] / seconds / 1e6:.1f} MB/s uncompressed"
+        )
+        return totals
+
+    def _drop_segment(self, name: str):
+        segment = self._segments.pop(name, None)
+        if segment:
+            segment.close()
+
+    def segments(self) -> list[Segment]:
+        result = []
+        for entry in self.manifest["archives"].values():
+            name = entry["segment"]
+            if name not in self._segments:
+                self._segments[name] = Segment(os.path.join(self.directory, name))
+            result.append(self._segments[name])
+        return result
+
+    def count_by_kind(self) -> dict:
+        counts = {kind: 0 for kind in EVENT_KINDS}
+        for segment in self.segments():
+            for code in segment.columns["kind"]:
+                counts[EVENT_KINDS[code]] += 1
+        return counts
+
+    def events(self, kind: Optional[str] = None, player: Optional[str] = None,
+               since: Optional[float] = None, until: Optional[float] = None):
+        """Yield (timestamp, kind, player, detail) tuples matching every given filter."""
+        kind_code = EVENT_KINDS.index(kind) if kind else None
+        for segment in self.segments():
+            player_id = None
+            if player is not None:
+                try:
+                    player_id = segment.strings.index(player)
+                except ValueError:
+                    continue
+
+            ts, kinds, players, details = (segment.columns[name] for name in ("ts", "kind", "player", "detail"))
+            for i in range(len(segment)):
+                if kind_code is not None and kinds[i] != kind_code:
+                    continue
+                if player_id is not None and players[i] != player_id:
+                    continue
+                if (since is not None and ts[i] < since) or (until is not None and ts[i] >= until):
+                    continue
+                yield ts[i], EVENT_KINDS[kinds[i]], segment.string(players[i]), segment.string(details[i])
+
+    def close(self):
+        for name in list(self._segments):
+            self._drop_segment(name)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="[%(asctime)s] [%(levelname)s] %(message)s")
+    if len(sys.argv) < 2:
+        print("usage: python event_store.py <server log directory> [workers]")
+        sys.exit(1)
+
+    store = EventStore()
+    store.ingest(Path(sys.argv[1]), int(sys.argv[2]) if len(sys.argv) > 2 else None)
+    for kind, count in store.count_by_kind().items():
+        print(f"  {kind}: {count}")
+    store.close()
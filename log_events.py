@@ -0,0 +1,128 @@
+"""
+Minecraft server log event rules, shared by the live relay in bot.py and the
+historical ingestion in event_store.py. Standard library only, so worker
+processes can import it without pulling in discord.py.
+"""
+
+import re
+from datetime import datetime, date
+from typing import Optional
+
+class LogEventRule:
+    """
+    One relayable log event. `pattern` is matched against the message body
+    (the text after the `[thread/LEVEL] [logger]: ` header); its named groups
+    plus `body` are available to `template`. Set `template` to None for events
+    that are tracked but not relayed.
+    """
+
+    def __init__(self, name: str, pattern: str, template: Optional[str]):
+        self.name = name
+        self.pattern = pattern
+        self.template = template
+
+class LogEvent:
+    def __init__(self, rule: LogEventRule, fields: dict, body: str, timestamp: str):
+        self.rule = rule
+        self.fields = fields
+        self.body = body
+        self.timestamp = timestamp
+
+    @property
+    def kind(self) -> str:
+        return self.rule.name
+
+    def render(self) -> Optional[str]:
+        if self.rule.template is None:
+            return None
+        return self.rule.template.format(body=self.body, **self.fields)
+
+DEATH_VERBS = (
+    "was", "fell", "drowned", "died", "blew up", "tried", "walked", "hit", "went", "got", "discovered",
+    "suffocated", "starved", "froze", "burned", "shot", "killed", "crashed", "squashed", "impaled",
+)
+
+# Order matters: the first rule that matches the body wins
+LOG_EVENT_RULES = [
+    # 1.19+ tags chat from clients without signed messages with "[Not Secure] "
+    LogEventRule("chat", r"(?:\[Not Secure\] )?<(?P<player>[^>]+)> (?P<message>.+)", "💬 **{player}**: {message}"),
+    LogEventRule("join", r"(?P<player>\S+) joined the game", "➕ **{player}** joined the game"),
+    LogEventRule("leave", r"(?P<player>\S+) left the game", "➖ **{player}** left the game"),
+    LogEventRule(
+        "advancement",
+        r"(?P<player>\S+) has (?:made the advancement|completed the challenge|reached the goal) \[(?P<advancement>.+)\]",
+        "🏅 **{player}** earned advancement **{advancement}**!"
+    ),
+    LogEventRule(
+        "death",
+        r"(?P<player>\w+) (?:" + "|".join(re.escape(v) for v in DEATH_VERBS) + r")\b.*",
+        "💀 {body}"
+    ),
+    LogEventRule("boot", r"Done \((?P<seconds>[\d.,]+)s\)! For help, type.*", None),
+]
+
+# Only these threads/loggers ever emit the events above; everything else is rejected before any rule runs
+LOG_EVENT_THREADS = {"Server thread"}
+LOG_EVENT_LOGGERS = {None, "minecraft/MinecraftServer", "minecraft/DedicatedServer"}
+
+LOG_HEADER_PATTERN = re.compile(
+    r"\[(?P<timestamp>[^\]]+)\] \[(?P<thread>[^\]/]+)/(?P<level>[A-Z]+)\](?: \[(?P<logger>[^\]]*)\])?: "
+)
+
+class LogClassifier:
+    """
+    Single-pass classifier for server log lines. The rules are compiled once
+    into one alternation; a line is rejected by a substring check and its
+    header before the combined pattern ever runs.
+    """
+
+    def __init__(self, rules: list[LogEventRule]):
+        self.rules = {}
+        alternatives = []
+        for rule in rules:
+            group = f"rule_{rule.name}"
+            # Namespace each rule's groups so they can share one pattern
+            body = re.sub(r"\(\?P<(\w+)>", lambda m: f"(?P<{group}__{m.group(1)}>", rule.pattern)
+            alternatives.append(f"(?P<{group}>{body})")
+            self.rules[group] = rule
+        self.pattern = re.compile("(?:" + "|".join(alternatives) + r")\s*$")
+        self.stats = {"lines": 0, "rejected": 0, "matched": 0}
+
+    def classify(self, line: str) -> Optional[LogEvent]:
+        self.stats["lines"] += 1
+        if "/INFO]" not in line:
+            self.stats["rejected"] += 1
+            return None
+
+        header = LOG_HEADER_PATTERN.match(line)
+        if (not header or header["level"] != "INFO"
+                or header["thread"] not in LOG_EVENT_THREADS
+                or header["logger"] not in LOG_EVENT_LOGGERS):
+            self.stats["rejected"] += 1
+            return None
+
+        match = self.pattern.match(line, header.end())
+        if not match:
+            return None
+
+        group = match.lastgroup
+        prefix = group + "__"
+        fields = {k[len(prefix):]: v for k, v in match.groupdict().items() if v is not None and k.startswith(prefix)}
+        self.stats["matched"] += 1
+        return LogEvent(self.rules[group], fields, line[header.end():].rstrip(), header["timestamp"])
+
+def parse_log_timestamp(stamp: str, day: Optional[date] = None) -> Optional[float]:
+    """
+    `27Jun2025 14:03:12.345` (Forge) or `14:03:12` (vanilla) → epoch seconds.
+    Vanilla stamps carry no date, so `day` (default: today) supplies it.
+    """
+    stamp = stamp.split(".", 1)[0]
+    for fmt in ("%d%b%Y %H:%M:%S", "%H:%M:%S"):
+        try:
+            dt = datetime.strptime(stamp, fmt)
+        except ValueError:
+            continue
+        if fmt == "%H:%M:%S":
+            dt = datetime.combine(day or date.today(), dt.time())
+        return dt.timestamp()
+    return None
@@ -0,0 +1,20 @@
+from log_events import LOG_EVENT_RULES, LogClassifier
+
+classifier = LogClassifier(LOG_EVENT_RULES)
+
+def test_chat_line():
+    event = classifier.classify("[14:03:12] [Server thread/INFO]: <Steve> hi there")
+    assert event.kind == "chat"
+    assert event.fields == {"player": "Steve", "message": "hi there"}
+    assert event.render() == "💬 **Steve**: hi there"
+
+def test_unsigned_chat_line():
+    event = classifier.classify(
+        "[27Jun2025 14:03:12.345] [Server thread/INFO] [minecraft/MinecraftServer]: [Not Secure] <Steve> hi there"
+    )
+    assert event.kind == "chat"
+    assert event.fields == {"player": "Steve", "message": "hi there"}
+    assert event.render() == "💬 **Steve**: hi there"
+
+def test_other_threads_are_rejected():
+    assert classifier.classify("[14:03:12] [Worker-Main-1/INFO]: <Steve> hi there") is None